@@ -2,4 +2,12 @@
 from sprynger.meta import Meta
 from sprynger.metadata import Metadata
 from sprynger.openaccess import OpenAccess
+from sprynger.harvest import Harvest
+from sprynger.count import count
 from sprynger.utils.startup import init
+from sprynger.utils.fetch import circuit_state, close_sessions
+from sprynger.async_meta import AsyncMeta
+from sprynger.async_openaccess import AsyncOpenAccess
+from sprynger.utils.transport import aclose_sessions
+from sprynger import cache
+from sprynger import shard
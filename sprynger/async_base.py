@@ -0,0 +1,155 @@
+"""Asynchronous counterpart of the Base and Retrieve classes."""
+from __future__ import annotations
+import asyncio
+import time
+from typing import AsyncIterator, Literal, Optional, Union
+import warnings
+
+from sprynger.base import _REVALIDATING, _REVALIDATING_LOCK, Base, MockResponse
+from sprynger.retrieve import QueryBuilder
+from sprynger.utils.fetch import fetch_data_async
+from sprynger.utils.singleflight import ASYNC_SINGLE_FLIGHT
+from sprynger.utils.transport import AsyncTransport, default_transport
+
+
+class AsyncBase(Base):
+    """Base class to retrieve data from the Springer API with asyncio.
+
+    The query, paging and cache layout are shared with `Base`. Requests go through
+    a pluggable `AsyncTransport` and the cache is read and written in the default
+    executor, so the event loop is never blocked.
+    """
+    def __init__(self,
+                 query: str,
+                 api: Literal['Metadata', 'Meta', 'OpenAccess'],
+                 start: int = 1,
+                 nr_results: int = 10,
+                 premium: bool = False,
+                 cache: bool = True,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
+                 transport: Optional[AsyncTransport] = None) -> None:
+        self._setup(query=query,
+                    api=api,
+                    start=start,
+                    nr_results=nr_results,
+                    premium=premium,
+                    cache=cache,
+                    refresh=refresh,
+                    workers=workers)
+        self._transport = transport or default_transport()
+        self._res = None
+
+    async def _retrieve(self) -> None:
+        """Fetch all the pages of the query, up to `workers` at a time."""
+        self._res = await self._afetch_or_load(self._start, self._limit)
+        n_found = self._get_total_results()
+
+        if n_found == 0:
+            warnings.warn('No results where found. Check the query.', UserWarning)
+
+        semaphore = asyncio.Semaphore(self._workers)
+        async def fetch_page(page: tuple[int, int]):
+            async with semaphore:
+                return await self._afetch_or_load(*page)
+
+        pages = self._get_pages(n_found)[1:]
+        responses = await asyncio.gather(*(fetch_page(p) for p in pages))
+        self._res = self._merge_responses([self._res, *responses])
+        if self._release_raw and responses:
+            # Only a merged response is owned by the object, see `Base`
+            self._res.release_raw()
+
+    async def _aiter_pages(self) -> AsyncIterator[MockResponse]:
+        """Fetch the pages one at a time and yield their responses. The pages are
+        merged into the response once the last one arrived, like in `_retrieve`."""
+        self._res = await self._afetch_or_load(self._start, self._limit)
+        n_found = self._get_total_results()
+        responses = [self._res]
+        yield self._res
+        for page in self._get_pages(n_found)[1:]:
+            tmp_res = await self._afetch_or_load(*page)
+            responses.append(tmp_res)
+            yield tmp_res
+        self._res = self._merge_responses(responses)
+        if self._release_raw and len(responses) > 1:
+            self._res.release_raw()
+
+    async def _afetch_or_load(self, start: int, limit: int) -> MockResponse:
+        """Fetch or load a page from the cache."""
+        cache_key = self._get_cache_key(start, limit)
+        res, fetched_at = self._load_from_memory(cache_key)
+        if res is not None:
+            self._revalidate_if_stale(cache_key, fetched_at)
+            return res
+        res, fetched_at = await asyncio.to_thread(self._load_fresh, cache_key)
+        if res is None:
+            params = self._get_params(start, limit)
+            res = await ASYNC_SINGLE_FLIGHT.do((cache_key, self._cache),
+                                               lambda: self._afetch(params, cache_key))
+            fetched_at = time.time()
+        self._save_to_memory(cache_key, res, fetched_at)
+        self._revalidate_if_stale(cache_key, fetched_at)
+        return res
+
+    async def _afetch(self, params: dict, cache_key: tuple) -> MockResponse:
+        """Fetch data from the API and cache the response. Transports send plain
+        requests, so unchanged pages are detected by the hash of their body."""
+        self._check_online(cache_key)
+        validators = await asyncio.to_thread(self._get_validators, cache_key)
+        res = await fetch_data_async(url=self._url, params=params,
+                                     transport=self._transport, plan=self._plan)
+        return await asyncio.to_thread(self._store_response, res, cache_key, validators)
+
+    def _start_revalidation(self, cache_key: tuple) -> None:
+        """Refresh a page in a task of the running loop, so that the request goes
+        through the transport like any other."""
+        task = asyncio.get_running_loop().create_task(self._arevalidate(cache_key))
+        # The loop only keeps weak references to its tasks
+        _REVALIDATE_TASKS.add(task)
+        task.add_done_callback(_REVALIDATE_TASKS.discard)
+
+    async def _arevalidate(self, cache_key: tuple) -> None:
+        """Fetch a page again and replace it in the cache and in memory."""
+        try:
+            params = self._get_params(*cache_key[2:])
+            res = await ASYNC_SINGLE_FLIGHT.do((cache_key, self._cache),
+                                               lambda: self._afetch(params, cache_key))
+            self._save_to_memory(cache_key, res, time.time())
+        except Exception as e:  # pylint: disable=broad-except
+            # The stale page was already served, it is fetched again on the next access
+            warnings.warn(f'Background refresh of {cache_key} failed: {e}', RuntimeWarning)
+        finally:
+            with _REVALIDATING_LOCK:
+                _REVALIDATING.discard(cache_key)
+
+
+_REVALIDATE_TASKS: set[asyncio.Task] = set()
+
+
+class AsyncRetrieve(QueryBuilder, AsyncBase):
+    """Retrieve data from the Springer API with asyncio."""
+    def __init__(self,
+                 query: str,
+                 api: Literal['Metadata', 'Meta', 'OpenAccess'],
+                 start: int = 1,
+                 nr_results: int = 10,
+                 premium: bool = False,
+                 cache: bool = True,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
+                 transport: Optional[AsyncTransport] = None,
+                 **kwargs):
+        """This class handles the query to retrieve the data from the Springer API."""
+
+        query = self._make_query(query, kwargs, api, premium)
+
+        super().__init__(query=query,
+                         api=api,
+                         start=start,
+                         nr_results=nr_results,
+                         premium=premium,
+                         cache=cache,
+                         refresh=refresh,
+                         workers=workers,
+                         transport=transport)
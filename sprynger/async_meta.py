@@ -0,0 +1,100 @@
+"""
+Module with AsyncMeta class.
+"""
+from __future__ import annotations
+from typing import AsyncIterator, Optional, Union
+
+from sprynger.async_base import AsyncRetrieve
+from sprynger.meta import MetaParser
+from sprynger.utils.data_structures import MetaRecord
+from sprynger.utils.transport import AsyncTransport
+
+
+class AsyncMeta(MetaParser, AsyncRetrieve):
+    """Asynchronous version of `Meta`. It shares the query building, cache and
+    parsers of `Meta` but fetches the pages with asyncio."""
+
+    def __init__(self,
+                 query: str = '',
+                 start: int = 1,
+                 nr_results: int = 10,
+                 premium: bool = False,
+                 cache: bool = True,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
+                 transport: Optional[AsyncTransport] = None,
+                 **kwargs):
+        """
+        Args:
+            query (str): The query to search for.
+            start (int): The starting index for the results. Defaults to 1.
+            nr_results (int): The number of results to retrieve. Defaults to 10.
+            premium (bool): Whether the user has a premium account. Defaults to False.
+            cache (bool): Whether to cache the results. Defaults to True.
+            refresh (bool|int|str): Weather to refresh the cache. If an integer is provided,
+                it will be used as the cache expiration time in days.
+                With 'swr', stale pages are served at once and refreshed in the
+                background. Defaults to False.
+            workers (int): Number of pages to fetch concurrently. Defaults to the
+                `Concurrency` value in the `[Requests]` section of the configuration.
+            transport (AsyncTransport): Transport used to send the requests. Defaults to
+                aiohttp if installed and to a thread-based transport otherwise.
+            kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
+
+        Creating the object does not fetch anything. Either await `AsyncMeta.create(...)`
+        to retrieve all the records, or iterate with `async for` to fetch the pages as
+        they are consumed. After a complete `async for`, `records`, `results`, `facets`,
+        `len()` and indexing cover all pages, as after `create()`. If the iteration stops
+        early they only cover the pages fetched so far (`len()` and indexing are empty).
+
+        Example:
+            >>> meta = await AsyncMeta.create('Segmentation', issn='1573-7497')
+            >>> for record in meta:
+            >>>     print(record)
+            >>> async for record in AsyncMeta('Segmentation', nr_results=100):
+            >>>     print(record)
+        """
+        super().__init__(query=query,
+                         api='Meta',
+                         start=start,
+                         nr_results=nr_results,
+                         premium=premium,
+                         cache=cache,
+                         refresh=refresh,
+                         workers=workers,
+                         transport=transport,
+                         **kwargs)
+        self._records = None
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> AsyncMeta:
+        """Create the object and retrieve all its records."""
+        self = cls(*args, **kwargs)
+        await self._retrieve()
+        self._records = self.records
+        return self
+
+    async def __aiter__(self) -> AsyncIterator[MetaRecord]:
+        if self._records is not None:
+            for record in self._records:
+                yield record
+        else:
+            records = []
+            async for res in self._aiter_pages():
+                page_records = self._parse_response(res)
+                records.extend(page_records)
+                for record in page_records:
+                    yield record
+            self._records = records
+
+    def __iter__(self):
+        return iter(self._records or [])
+
+    def __getitem__(self, index):
+        return (self._records or [])[index]
+
+    def __len__(self):
+        return len(self._records or [])
+
+    def __repr__(self):
+        return (self._records or []).__repr__()
@@ -0,0 +1,96 @@
+"""
+Module with the AsyncOpenAccess class to retrieve Open Access documents with asyncio.
+
+Example:
+    >>> from sprynger import AsyncOpenAccess
+    >>> async for doc in AsyncOpenAccess('"Gaussian-mixture models"', datefrom='2024-01-01'):
+    >>>     print(doc.doi)
+"""
+from __future__ import annotations
+from typing import AsyncIterator, Optional, Union
+
+from sprynger.async_base import AsyncRetrieve
+from sprynger.openaccess import OpenAccessParser
+from sprynger.openaccess_article import Article
+from sprynger.openaccess_chapter import Chapter
+from sprynger.utils.transport import AsyncTransport
+
+
+class AsyncOpenAccess(OpenAccessParser, AsyncRetrieve):
+    """Asynchronous version of `OpenAccess`. It shares the query building, cache and
+    parsers of `OpenAccess` but fetches the pages with asyncio."""
+
+    def __init__(
+        self,
+        query: str = '',
+        start: int = 1,
+        nr_results: int = 10,
+        premium: bool = False,
+        cache: bool = True,
+        refresh: Union[bool, int, str] = False,
+        workers: Optional[int] = None,
+        transport: Optional[AsyncTransport] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            query (str): Query string.
+            start (int): Start index of the results.
+            nr_results (int): Number of results to retrieve.
+            premium (bool): Use the premium API.
+            cache (bool): Use the cache.
+            refresh (Union[bool, int, str]): Refresh the cache. With 'swr' stale pages
+                are served and refreshed in the background.
+            workers (Optional[int]): Number of pages to fetch concurrently.
+            transport (Optional[AsyncTransport]): Transport used to send the requests.
+            **kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
+
+        Creating the object does not fetch anything. Either await `AsyncOpenAccess.create(...)`
+        to retrieve all the documents, or iterate with `async for` to fetch the pages as
+        they are consumed. After a complete `async for`, `documents`, `documents_found`,
+        `xml`, `len()` and indexing cover all pages, as after `create()`.
+        """
+        super().__init__(query=query,
+                         api='OpenAccess',
+                         start=start,
+                         nr_results=nr_results,
+                         premium=premium,
+                         cache=cache,
+                         refresh=refresh,
+                         workers=workers,
+                         transport=transport,
+                         **kwargs)
+        self.documents = None
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> AsyncOpenAccess:
+        """Create the object and retrieve all its documents."""
+        self = cls(*args, **kwargs)
+        await self._retrieve()
+        self.documents = self._get_documents()
+        return self
+
+    async def __aiter__(self) -> AsyncIterator[Union[Chapter, Article]]:
+        if self.documents is not None:
+            for document in self.documents:
+                yield document
+        else:
+            documents = []
+            async for res in self._aiter_pages():
+                page_documents = self._parse_response(res)
+                documents.extend(page_documents)
+                for document in page_documents:
+                    yield document
+            self.documents = documents
+
+    def __iter__(self):
+        return iter(self.documents or [])
+
+    def __getitem__(self, index):
+        return (self.documents or [])[index]
+
+    def __len__(self):
+        return len(self.documents or [])
+
+    def __repr__(self):
+        return (self.documents or []).__repr__()
@@ -1,32 +1,53 @@
 """Base class to retrieve data from the Springer API."""
 from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from itertools import islice
 from math import ceil
-import os
 import hashlib
 import json
+import re
+import threading
+import time
 from json.decoder import JSONDecodeError
-from typing import Optional, Literal, Union
+from typing import Iterator, Optional, Literal, Union
 from datetime import datetime, timedelta
 import warnings
+import zlib
 
 from lxml import etree
 from requests import Response
 
-from sprynger.utils.constants import BASE_URL, FORMAT, LIMIT, ONLINE_API
+from sprynger.exceptions import CacheMissError, CorruptCacheError
+from sprynger.utils.cache import (CHUNK_SIZE,
+                                  REVALIDATIONS,
+                                  decompress,
+                                  get_cache_store,
+                                  get_count_store,
+                                  get_memory_cache,
+                                  iter_decompress)
+from sprynger.utils.constants import BASE_URL, FORMAT, LIMIT, ONLINE_API, REVALIDATE_WORKERS
 from sprynger.utils.fetch import fetch_data
-from sprynger.utils.parse import chained_get
+from sprynger.utils.parse import chained_get, get_attr
+from sprynger.utils.records import get_record_store
+from sprynger.utils.singleflight import SINGLE_FLIGHT
 from sprynger.utils.startup import get_config, get_key
 
 class Base:
     """Base class to retrieve data from the Springer API."""
     @property
     def _json(self) -> dict:
-        """JSON response from the API."""
+        """JSON response from the API (empty before anything was fetched)."""
+        if self._res is None:
+            return {}
         return _to_json(self._res)
 
     @property
-    def _xml(self) -> etree._Element:
-        """XML response from the API."""
+    def _xml(self) -> Optional[etree._Element]:
+        """XML response from the API (None before anything was fetched)."""
+        if self._res is None:
+            return None
         return _to_xml(self._res)
 
     def __init__(self,
@@ -36,133 +57,516 @@ class Base:
                  nr_results: int = 10,
                  premium: bool = False,
                  cache: bool = True,
-                 refresh: Union[bool, int] = False) -> None:
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None) -> None:
 
+        self._setup(query=query,
+                    api=api,
+                    start=start,
+                    nr_results=nr_results,
+                    premium=premium,
+                    cache=cache,
+                    refresh=refresh,
+                    workers=workers)
+
+        self._res = self._fetch_or_load(self._start, self._limit)
+        n_found = self._get_total_results()
+
+        if n_found == 0:
+            warnings.warn('No results where found. Check the query.', UserWarning)
+
+        pages = self._fetch_pages(self._get_pages(n_found)[1:])
+        self._res = self._merge_responses([self._res, *pages])
+        if self._release_raw and pages:
+            # Only a merged response is owned by the object, single pages are shared
+            # with the in-memory cache and concurrent queries
+            self._res.release_raw()
+
+
+    def _setup(self,
+               query: str,
+               api: Literal['Metadata', 'Meta', 'OpenAccess'],
+               start: int,
+               nr_results: int,
+               premium: bool,
+               cache: bool,
+               refresh: Union[bool, int, str],
+               workers: Optional[int]) -> None:
+        """Set the query, paging and cache settings without fetching anything."""
         config = get_config()
 
         self._api = api
         online_api = ONLINE_API[api]
-        rate_limit = LIMIT['Premium'][api] if premium else LIMIT['Basic'][api]
-        limit = min(nr_results, rate_limit)
+        self._plan = 'Premium' if premium else 'Basic'
+        rate_limit = LIMIT[self._plan][api]
 
-        key = get_key(api)
+        self._key = get_key(api)
+        self._query = query
         self._url = f'{BASE_URL}/{online_api}/{FORMAT[api]}'
-        self._params = {'q': query,
-                        's': start,
-                        'p': limit,
-                        'api_key': key}
-
-        # Generate a cache key based on the parameters
-        cache_dir = chained_get(config, ['Directories', api])
-        cache_key = self._create_cache_key(query, start, limit)
-        self._cache_file = os.path.join(cache_dir, f'{cache_key}.{FORMAT[api]}')
+        self._start = start
+        self._limit = min(nr_results, rate_limit)
+        self._nr_results = nr_results
+
+        self._store = get_cache_store(config, api, FORMAT[api])
+        self._memory = get_memory_cache(config)
+        self._record_store = get_record_store(config)
+        if isinstance(refresh, str) and refresh != 'swr':
+            raise ValueError(f"Unknown refresh mode: {refresh}. Use a bool, an int or 'swr'.")
         self._refresh = refresh
+        self._stale_ttl = float(chained_get(config, ['Cache', 'StaleTTL'], 1))
         self._cache = cache
+        self._offline = bool(chained_get(config, ['Requests', 'Offline'], False))
+        self._release_raw = bool(chained_get(config, ['Cache', 'ReleaseRaw'], False))
 
-        self._res = self._fetch_or_load()
-        n_found = self._get_total_results()
+        # Number of pages fetched in parallel, bounded by the connection pool size
+        if workers is None:
+            workers = int(chained_get(config, ['Requests', 'Concurrency'], 1))
+        pool_maxsize = int(chained_get(config, ['Requests', 'PoolMaxsize'], 10))
+        self._workers = max(1, min(workers, pool_maxsize))
+
+    def _iter_pages(self, prefetch: int = 0) -> Iterator[MockResponse]:
+        """Fetch or load the pages one at a time, each when the previous one was consumed.
 
+        With `prefetch`, up to that many of the next pages are fetched in the background
+        while the current one is processed. No more are fetched until the consumer
+        catches up, so at most `prefetch` pages wait in memory.
+        """
+        res = self._fetch_or_load(self._start, self._limit)
+        n_found = self._get_total_results(res)
         if n_found == 0:
             warnings.warn('No results where found. Check the query.', UserWarning)
+        pages = iter(self._get_pages(n_found)[1:])
+        if prefetch <= 0:
+            yield res
+            for page in pages:
+                yield self._fetch_or_load(*page)
+            return
+        with ThreadPoolExecutor(max_workers=min(self._workers, prefetch),
+                                thread_name_prefix='sprynger-prefetch') as executor:
+            pending = deque(executor.submit(self._fetch_or_load, *page)
+                            for page in islice(pages, prefetch))
+            try:
+                yield res
+                while pending:
+                    res = pending.popleft().result()
+                    for page in islice(pages, 1):
+                        pending.append(executor.submit(self._fetch_or_load, *page))
+                    yield res
+            finally:
+                # The consumer stopped early, drop the pages not fetched yet
+                for future in pending:
+                    future.cancel()
+
+    def _get_pages(self, n_found: int) -> list[tuple[int, int]]:
+        """Split the requested results into (start, limit) pages of at most `limit` records."""
+        n = min(self._nr_results, n_found)
+        pages = []
+        for i in range(ceil(n / self._limit)):
+            pages.append((self._start + i * self._limit, min(self._limit, n - i * self._limit)))
+        return pages
 
-        n = min(nr_results, n_found)
-        n_chunks = ceil(n / limit)
-        for i in range(1, n_chunks):
-            new_start = start + i * limit
-            n -= limit
-            limit = min(n, limit)
-            # Update variables for querying the next chunk
-            self._params.update({'s': new_start,
-                                 'p': limit})
-            cache_key = self._create_cache_key(query, new_start, limit)
-            self._cache_file = os.path.join(cache_dir, f'{cache_key}.{FORMAT[api]}')
-            tmp_res = self._fetch_or_load()
-            self._res = self._append_response(tmp_res)
-
-
-    def _create_cache_key(self, query: str, start: int, limit: int) -> str:
-        """Create a cache key based on the query and start."""
-        cache_key = f'{query}_{start}_{limit}'
-        cache_key = hashlib.md5(cache_key.encode()).hexdigest()
-        return cache_key
-
-
-    def _append_response(self, tmp_res: Union[Response, MockResponse]):
-        """Append the response to the current response."""
+    def _fetch_pages(self, pages: list[tuple[int, int]]) -> list[Union[Response, MockResponse]]:
+        """Fetch or load the given pages, in parallel if more than one worker is set.
+        The responses are returned in page order."""
+        if self._workers == 1 or len(pages) < 2:
+            return [self._fetch_or_load(s, l) for s, l in pages]
+        with ThreadPoolExecutor(max_workers=min(self._workers, len(pages))) as executor:
+            return list(executor.map(lambda page: self._fetch_or_load(*page), pages))
+
+    def _get_cache_key(self, start: int, limit: int) -> tuple[str, str, int, int]:
+        """Key of a page in the cache store."""
+        return (self._api, self._query, start, limit)
+
+    def _get_params(self, start: int, limit: int) -> dict:
+        """Request parameters of a page."""
+        return {'q': self._query,
+                's': start,
+                'p': limit,
+                'api_key': self._key}
+
+
+    def _merge_responses(self,
+                         responses: list[Union[Response, MockResponse]]) -> Union[Response, MockResponse]:
+        """Merge the pages of a query into one response. The records of all pages are
+        collected behind the first page and the response is built once, so the cost is
+        linear in the number of records."""
+        if len(responses) == 1:
+            return responses[0]
         if FORMAT[self._api] == 'json':
-            data_json = _to_json(self._res)
-            tmp_res_json = _to_json(tmp_res)
-            # Append the records from the tmp response to the current response
-            data_json['records'].extend(tmp_res_json.get('records', []))
+            # Copy the first page, the decoded pages may be shared with other queries
+            data_json = dict(_to_json(responses[0]))
+            records = list(data_json.get('records', []))
+            for tmp_res in responses[1:]:
+                records.extend(_to_json(tmp_res).get('records', []))
+            data_json['records'] = records
             return MockResponse(data_json)
         elif FORMAT[self._api] == 'jats':
-            data_xml = _to_xml(self._res)
-            tmp_res_xml = _to_xml(tmp_res)
-            # Append the records from the tmp response to the current response
-            data_records = data_xml.find('./records')
-            tmp_res_records = tmp_res_xml.find('./records')
-            for record in tmp_res_records:
-                data_records.append(record)
-            data_xml_str = etree.tostring(data_xml, encoding='unicode')
-            return MockResponse(data_xml_str, is_xml=True)
+            # The parsed pages may be shared as well, their records are copied
+            data_xml, data_records = _copy_envelope(_to_xml(responses[0]))
+            for tmp_res in responses:
+                tmp_res_records = _to_xml(tmp_res).find('./records')
+                if tmp_res_records is not None:
+                    data_records.extend(deepcopy(record) for record in tmp_res_records)
+            return MockResponse(data_xml, is_xml=True)
         else:
             raise ValueError(f'Unknown format: {FORMAT[self._api]}')
 
-    def _fetch_or_load(self) -> Union[Response, MockResponse]:
-        """Fetch or load the data from the cache."""
-        if self._should_fetch():
-            res = self._fetch()
-        else:
-            res = self._load_from_cache()
+    def _response_records(self, res: Union[Response, MockResponse]) -> list:
+        """Raw records of a response: dicts for JSON, elements for JATS."""
+        if FORMAT[self._api] == 'json':
+            return _to_json(res).get('records', [])
+        elif FORMAT[self._api] == 'jats':
+            records = _to_xml(res).find('./records')
+            return list(records) if records is not None else []
+        raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+
+    def _record_doi(self, record: Union[dict, etree._Element]) -> Optional[str]:
+        """DOI of a raw record."""
+        if FORMAT[self._api] == 'json':
+            return record.get('doi')
+        elif FORMAT[self._api] == 'jats':
+            return (get_attr(record, 'article-id', 'pub-id-type', 'doi')
+                    or get_attr(record, 'book-part-id', 'book-part-id-type', 'doi'))
+        raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+
+    def _make_response(self,
+                       records: list,
+                       total: int,
+                       start: int = 1,
+                       envelope: Optional[bytes] = None) -> MockResponse:
+        """Build a response holding the given raw records, as returned by the API. The
+        rest of the response (e.g. the facets) is taken from `envelope` if given."""
+        result = {'total': total, 'start': start,
+                  'pageLength': self._limit, 'recordsDisplayed': len(records)}
+        if FORMAT[self._api] == 'json':
+            data = json.loads(envelope) if envelope else {'facets': []}
+            data_result = dict(data.get('result', [{}])[0])
+            data_result.update({tag: str(value) for tag, value in result.items()})
+            data['result'] = [data_result]
+            data['records'] = list(records)
+            return MockResponse(data)
+        elif FORMAT[self._api] == 'jats':
+            root = etree.fromstring(envelope) if envelope else etree.Element('response')
+            result_node = _find_or_add(root, 'result')
+            for tag, value in result.items():
+                _find_or_add(result_node, tag).text = str(value)
+            records_node = _find_or_add(root, 'records')
+            for record in records:
+                records_node.append(deepcopy(record))
+            return MockResponse(root, is_xml=True)
+        raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+
+    def _split_response(self, res: Union[Response, MockResponse]) -> tuple[bytes, list]:
+        """Split a response into its envelope (the response without records) and its
+        raw records."""
+        if FORMAT[self._api] == 'json':
+            data = _to_json(res)
+            envelope = {key: value for key, value in data.items() if key != 'records'}
+            return json.dumps(envelope).encode(), data.get('records', [])
+        elif FORMAT[self._api] == 'jats':
+            root = _to_xml(res)
+            records_node = root.find('./records')
+            records = list(records_node) if records_node is not None else []
+            return etree.tostring(_copy_envelope(root)[0]), records
+        raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+
+    def _record_to_bytes(self, record: Union[dict, etree._Element]) -> bytes:
+        """Serialize a raw record."""
+        if FORMAT[self._api] == 'json':
+            return json.dumps(record).encode()
+        return etree.tostring(record)
+
+    def _record_from_bytes(self, data: bytes) -> Union[dict, etree._Element]:
+        """Deserialize a raw record."""
+        if FORMAT[self._api] == 'json':
+            return json.loads(data)
+        return etree.fromstring(data)
+
+    def _fetch_or_load(self, start: int, limit: int) -> MockResponse:
+        """Fetch or load a page from the cache."""
+        cache_key = self._get_cache_key(start, limit)
+        res, fetched_at = self._load_from_memory(cache_key)
+        if res is not None:
+            self._revalidate_if_stale(cache_key, fetched_at)
+            return res
+        res, fetched_at = self._load_fresh(cache_key)
+        if res is None:
+            # Concurrent fetches of the same page share one request and one cache write
+            params = self._get_params(start, limit)
+            res = SINGLE_FLIGHT.do((cache_key, self._cache),
+                                   lambda: self._fetch(params, cache_key))
+            fetched_at = time.time()
+        self._save_to_memory(cache_key, res, fetched_at)
+        self._revalidate_if_stale(cache_key, fetched_at)
         return res
 
-    def _get_total_results(self):
-        """Get the total number of results for the query."""
+    def _revalidate_if_stale(self, cache_key: tuple, fetched_at: float) -> None:
+        """With `refresh='swr'`, fetch a page older than `StaleTTL` days again in the
+        background. The page is refreshed at most once at a time."""
+        if self._refresh != 'swr' or not self._cache or self._offline:
+            return
+        cache_age = datetime.now() - datetime.fromtimestamp(fetched_at)
+        if cache_age <= timedelta(days=self._stale_ttl):
+            return
+        with _REVALIDATING_LOCK:
+            if cache_key in _REVALIDATING:
+                return
+            _REVALIDATING.add(cache_key)
+        self._start_revalidation(cache_key)
+
+    def _start_revalidation(self, cache_key: tuple) -> None:
+        """Refresh a page in the background revalidation pool."""
+        _REVALIDATE_POOL.submit(self._revalidate, cache_key)
+
+    def _revalidate(self, cache_key: tuple) -> None:
+        """Fetch a page again and replace it in the cache and in memory."""
+        try:
+            params = self._get_params(*cache_key[2:])
+            res = SINGLE_FLIGHT.do((cache_key, self._cache),
+                                   lambda: self._fetch(params, cache_key))
+            self._save_to_memory(cache_key, res, time.time())
+        except Exception as e:  # pylint: disable=broad-except
+            # The stale page was already served, it is fetched again on the next access
+            warnings.warn(f'Background refresh of {cache_key} failed: {e}', RuntimeWarning)
+        finally:
+            with _REVALIDATING_LOCK:
+                _REVALIDATING.discard(cache_key)
+
+    def _load_fresh(self, cache_key: tuple) -> tuple[Optional[MockResponse], Optional[float]]:
+        """Response and fetch time of a page from the cache store or, failing that,
+        rebuilt from the record store. (None, None) if the page has to be fetched."""
+        fetched_at = self._store.fetched_at(cache_key)
+        if not self._is_stale(fetched_at):
+            try:
+                return self._load_from_cache(cache_key), fetched_at
+            except (CorruptCacheError, FileNotFoundError):
+                pass  # Fetched again and overwritten, or evicted in the meantime
+        return self._load_from_records(cache_key)
+
+    def _load_from_records(self, cache_key: tuple) -> tuple[Optional[MockResponse], Optional[float]]:
+        """Rebuild a page from the stored records of its query, or of its DOI."""
+        if self._record_store is None:
+            return None, None
+        api, query, start, limit = cache_key
+        page = self._record_store.get_page(api, query, start, limit)
+        if page is not None and not self._is_stale(page[2]):
+            total, envelope, fetched_at, bodies = page
+            records = [self._record_from_bytes(body) for body in bodies]
+            return self._make_response(records, total, start, envelope), fetched_at
+        doi = _get_query_doi(query)
+        if doi and start == 1:
+            stored = self._record_store.get_record(api, doi)
+            if stored is not None and not self._is_stale(stored[1]):
+                return self._make_response([self._record_from_bytes(stored[0])], total=1), stored[1]
+        return None, None
+
+    def _save_records(self, res: Union[Response, MockResponse], cache_key: tuple) -> None:
+        """Add the records of a page and their positions to the record store."""
+        if self._record_store is None:
+            return
+        api, query, start, _ = cache_key
+        envelope, records = self._split_response(res)
+        dois = [self._record_doi(record) for record in records]
+        if None in dois:
+            return  # Records without DOI can't be stored, so the positions would have gaps
+        self._record_store.add_page(api, query, start, self._get_total_results(res), envelope,
+                                    [(doi, self._record_to_bytes(record))
+                                     for doi, record in zip(dois, records)])
+
+    def _load_from_memory(self, cache_key: tuple) -> tuple[Optional[MockResponse], Optional[float]]:
+        """Decoded response and fetch time of a page held in memory, if it is still
+        fresh. (None, None) otherwise."""
+        if self._memory is None:
+            return None, None
+        entry = self._memory.get(cache_key)
+        hit = entry is not None and not self._is_stale(entry[1])
+        self._memory.record(hit)
+        return entry if hit else (None, None)
+
+    def _save_to_memory(self, cache_key: tuple, res: MockResponse, fetched_at: float) -> None:
+        """Hold the response of a page in memory."""
+        if self._memory is not None and self._cache:
+            self._memory.put(cache_key, res, fetched_at, res.nbytes)
+
+    def _get_total_results(self, res: Optional[Union[Response, MockResponse]] = None):
+        """Get the total number of results for the query (of the given response,
+        by default the current one)."""
+        res = self._res if res is None else res
         if (self._api == 'Metadata') or (self._api == 'Meta'):
-            res_json = _to_json(self._res)
+            res_json = _to_json(res)
             total = res_json['result'][0]['total']
         elif self._api in ['OpenAccess']:
-            res_xml = _to_xml(self._res)
+            res_xml = _to_xml(res)
             total = res_xml.find('./result/total').text
         else:
             raise ValueError(f'Unknown API: {self._api}')
         return int(total)
 
-    def _should_fetch(self) -> bool:
-        """Determine whether the data has to be fetched."""
-        if isinstance(self._refresh, bool) and self._is_cached():
+    def _count(self) -> int:
+        """Number of results of the query. It is taken from the count store if it was
+        counted less than `CountTTL` days ago, otherwise a single record is requested
+        and only the total of the response is parsed. Pages are not cached."""
+        config = get_config()
+        store = get_count_store(config) if self._cache else None
+        if store is not None:
+            stored = store.get(self._api, self._query)
+            if stored is not None:
+                cache_age = datetime.now() - datetime.fromtimestamp(stored[1])
+                ttl = timedelta(days=float(chained_get(config, ['Cache', 'CountTTL'], 1)))
+                if self._offline or (self._refresh is not True and cache_age <= ttl):
+                    return stored[0]
+        self._check_online(self._get_cache_key(1, 1))
+        res = fetch_data(url=self._url, params=self._get_params(1, 1), plan=self._plan)
+        total = _parse_total(res.content, self._is_xml())
+        if store is not None:
+            store.put(self._api, self._query, total)
+        return total
+
+    def _is_stale(self, fetched_at: Optional[float]) -> bool:
+        """Whether a page fetched at the given time has to be fetched again."""
+        if fetched_at is None:
+            return True  # If no cache exists, return True to fetch
+        if self._offline:
+            return False  # Whatever is cached is used offline
+        if isinstance(self._refresh, bool):
             return self._refresh # If is cached user decides to fetch
-        elif isinstance(self._refresh, int) and self._is_cached():
-            cache_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(self._cache_file))
-            return cache_age > timedelta(days=self._refresh)  #Fetch if cache is older than specified days
-        return True  # If no cache exists, return True to fetch
-
-    def _is_cached(self) -> bool:
-        """Check if the cache file exists."""
-        return os.path.exists(self._cache_file)
-
-    def _load_from_cache(self) -> MockResponse:
-        """Load response from the cache."""
-        with open(self._cache_file, 'r') as f:
-            if FORMAT[self._api] == 'json':
-                return MockResponse(json.load(f))
-            elif FORMAT[self._api] == 'jats':  # XML-based format
-                return MockResponse(f.read(), is_xml=True)
-            else:
-                raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+        if self._refresh == 'swr':
+            return False  # Served as is and refreshed in the background
+        cache_age = datetime.now() - datetime.fromtimestamp(fetched_at)
+        return cache_age > timedelta(days=self._refresh)  #Fetch if cache is older than specified days
 
-    def _fetch(self) -> Response:
-        """Fetch data from the API and cache the response."""
-        res = fetch_data(url=self._url, params=self._params)
-        if self._cache:
-            # Save the response to the cache file depending on format
-            with open(self._cache_file, 'w') as f:
-                if FORMAT[self._api] == 'json':
-                    json.dump(res.json(), f)
-                elif FORMAT[self._api] == 'jats':  # XML-based format
-                    f.write(res.content.decode())
+    def _load_from_cache(self, cache_key: tuple) -> MockResponse:
+        """Load response from the cache.
+
+        Raises:
+            CorruptCacheError: If the entry is truncated or can't be decoded.
+        """
+        header, body = self._store.read(cache_key)
+        res = MockResponse(body, is_xml=self._is_xml(), headers=_cache_headers(header),
+                           codec=header.get('codec'))
+        try:
+            if not res.is_xml:
+                res.json()  # Decoded once here and kept for later
+            elif not header:
+                _to_xml(res)  # Entries without header can't be checked by their length
+        except (ValueError, etree.XMLSyntaxError, zlib.error) as e:
+            raise CorruptCacheError(f'Corrupt cache entry: {cache_key}') from e
         return res
 
+    def _fetch(self, params: dict, cache_key: tuple) -> MockResponse:
+        """Fetch data from the API and cache the response. A cached page is
+        requested conditionally, so that an unchanged page is not sent again."""
+        self._check_online(cache_key)
+        validators = self._get_validators(cache_key)
+        res = fetch_data(url=self._url, params=params, plan=self._plan,
+                         headers=_conditional_headers(validators))
+        if res.status_code == 304:
+            cached = self._load_not_modified(cache_key)
+            if cached is not None:
+                return cached
+            # The entry was evicted in the meantime
+            res = fetch_data(url=self._url, params=params, plan=self._plan)
+        return self._store_response(res, cache_key, validators)
+
+    def _check_online(self, cache_key: tuple) -> None:
+        """Raise if a page has to be fetched in offline mode.
+
+        Raises:
+            CacheMissError: If requests are disabled with `offline`.
+        """
+        if self._offline:
+            raise CacheMissError(f'Page not cached and requests are disabled (offline mode): '
+                                 f'{cache_key}')
+
+    def _get_validators(self, cache_key: tuple) -> dict:
+        """Validators of the cached page, empty if there is nothing to revalidate."""
+        return self._store.validators(cache_key) if self._cache else {}
+
+    def _load_not_modified(self, cache_key: tuple) -> Optional[MockResponse]:
+        """Renew the fetch time of a page the API reported as not modified and load
+        it from the cache. None if it can't be loaded anymore."""
+        self._store.mark_fresh(cache_key)
+        try:
+            res = self._load_from_cache(cache_key)
+        except (CorruptCacheError, FileNotFoundError):
+            return None
+        REVALIDATIONS.record(modified=False)
+        return res
+
+    def _store_response(self,
+                        res: Union[Response, MockResponse],
+                        cache_key: tuple,
+                        validators: dict) -> MockResponse:
+        """Cache a fetched response. A page whose body did not change since it was
+        cached only gets a new fetch time, without rewriting it or its records.
+        The body is parsed once, by the returned response, for the record store and
+        the caller alike."""
+        mock_res = MockResponse(res.content, is_xml=self._is_xml(), headers=res.headers)
+        mock_res.status_code = res.status_code
+        if validators:
+            modified = validators.get('sha256') != _sha256(mock_res.content)
+            REVALIDATIONS.record(modified)
+            if not modified:
+                self._store.mark_fresh(cache_key)
+                return mock_res
+        if self._cache:
+            self._write_cache(mock_res, cache_key)
+        return mock_res
+
+    def _write_cache(self, res: Union[Response, MockResponse], cache_key: tuple) -> None:
+        """Save the raw response body and its validators to the cache store."""
+        # Pages requested with a maximum age expire after it
+        ttl = None if isinstance(self._refresh, (bool, str)) else self._refresh * 86400
+        self._store.write(cache_key, res.content,
+                          status=res.status_code,
+                          content_type=res.headers.get('Content-Type'),
+                          ttl=ttl,
+                          validators={'etag': res.headers.get('ETag'),
+                                      'last_modified': res.headers.get('Last-Modified'),
+                                      'sha256': _sha256(res.content)})
+        self._save_records(res, cache_key)
+
+    def _is_xml(self) -> bool:
+        """Whether the responses of the API are XML (JATS)."""
+        if FORMAT[self._api] not in ('json', 'jats'):
+            raise ValueError(f'Unknown format: {FORMAT[self._api]}')
+        return FORMAT[self._api] == 'jats'
+
+_REVALIDATING: set[tuple] = set()
+_REVALIDATING_LOCK = threading.Lock()
+_REVALIDATE_POOL = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS,
+                                      thread_name_prefix='sprynger-revalidate')
+
+
+def _get_query_doi(query: str) -> Optional[str]:
+    """DOI of a query for a single DOI (e.g. `doi:10.1007/xyz`), otherwise None."""
+    match = re.fullmatch(r'doi:(\S+)', query)
+    return match.group(1) if match else None
+
+
+def _conditional_headers(validators: dict) -> Optional[dict]:
+    """Headers of a conditional request for a cached page, None if it has no validators."""
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers or None
+
+
+def _sha256(content: Union[bytes, str]) -> str:
+    """Hash of a response body."""
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+def _find_or_add(parent: etree._Element, tag: str) -> etree._Element:
+    """Child of an element with the given tag, added if missing."""
+    child = parent.find(tag)
+    return child if child is not None else etree.SubElement(parent, tag)
+
+
 def _to_json(response) -> dict:
     """Auxiliary method to convert the response to JSON."""
     try:
@@ -172,25 +576,141 @@ def _to_json(response) -> dict:
 
 def _to_xml(response) -> etree._Element:
     """Auxiliary method to convert the response to XML."""
+    if isinstance(response, MockResponse):
+        return response.xml()
     return etree.fromstring(text=response.content)
 
 
+def _parse_total(content: Union[bytes, str], is_xml: bool) -> int:
+    """Total number of results of a response body. JATS bodies are parsed only up to
+    the `result/total` element."""
+    if not is_xml:
+        return int(json.loads(content)['result'][0]['total'])
+    if isinstance(content, str):
+        content = content.encode()
+    parser = etree.XMLPullParser(events=('end',), tag='total')
+    for i in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[i:i + CHUNK_SIZE])
+        for _, element in parser.read_events():
+            if element.getparent() is not None and element.getparent().tag == 'result':
+                return int(element.text)
+    raise ValueError('No result/total in the response.')
+
+
+def _copy_envelope(root: etree._Element) -> tuple[etree._Element, etree._Element]:
+    """Copy of a JATS response without its records, and its (empty) records element."""
+    envelope = etree.Element(root.tag, root.attrib, nsmap=root.nsmap)
+    records_node = None
+    for child in root:
+        if child.tag == 'records':
+            records_node = etree.SubElement(envelope, 'records')
+        else:
+            envelope.append(deepcopy(child))
+    if records_node is None:
+        records_node = etree.SubElement(envelope, 'records')
+    return envelope, records_node
+
+
+def _cache_headers(header: dict) -> dict:
+    """Response headers stored in the header of a cache entry."""
+    if header.get('content_type'):
+        return {'Content-Type': header['content_type']}
+    return {}
+
+
 class MockResponse:
     """Mock response class for cached data."""
-    def __init__(self, data: Union[dict, str], is_xml: bool = False) -> None:
-        """Initialize the cached response, either JSON or XML (JATS)."""
-        self._data = data
+    def __init__(self,
+                 data: Union[dict, str, bytes, etree._Element],
+                 is_xml: bool = False,
+                 headers: Optional[dict] = None,
+                 codec: Optional[str] = None) -> None:
+        """Initialize the cached response, either JSON or XML (JATS). The data is
+        either the raw body, compressed with `codec` if given, or the decoded dict (JSON)
+        or element (XML)."""
         self.is_xml = is_xml
+        self.status_code = 200
+        self.headers = dict(headers or {})
+        self.codec = codec
+        self._raw = data if isinstance(data, (str, bytes)) else None
+        self._data = data if isinstance(data, dict) else None
+        self._tree = data if isinstance(data, etree._Element) else None
+        self._content = None if codec else self._raw
+        # Size of the decoded body, known once it was decoded
+        self._size = None if self._content is None else len(self._content)
 
     def json(self) -> Optional[dict]:
-        """Return the JSON data if it's JSON."""
+        """Return the JSON data if it's JSON. The body is decoded on first use only."""
+        if self.is_xml:
+            return None
+        if self._data is None:
+            self._data = json.loads(self.content)
+            self._drop_content()
+        return self._data
+
+    def xml(self) -> Optional[etree._Element]:
+        """Return the parsed XML if it's XML. The body is parsed on first use only,
+        a compressed body is fed to the parser chunk by chunk."""
         if not self.is_xml:
-            return self._data
-        return None
+            return None
+        if self._tree is None:
+            if self.codec and self._raw is not None and self._content is None:
+                parser = etree.XMLParser()
+                size = 0
+                for chunk in iter_decompress(self._raw, self.codec):
+                    parser.feed(chunk)
+                    size += len(chunk)
+                self._tree = parser.close()
+                self._size = size
+            else:
+                self._tree = etree.fromstring(text=self.content)
+                self._drop_content()
+        return self._tree
+
+    def _drop_content(self) -> None:
+        """Drop the decompressed body once it was decoded, it is decompressed again
+        from the raw body if needed."""
+        if self.codec and self._raw is not None:
+            self._content = None
+
+    def release_raw(self) -> None:
+        """Decode the body and drop it, keeping only the decoded dict or element.
+        The content is serialized again if it is needed later."""
+        if self.is_xml:
+            self.xml()
+        else:
+            self.json()
+        self._raw = None
+        self._content = None
+        self.codec = None
 
     @property
-    def content(self) -> str:
+    def content(self) -> Union[bytes, str]:
         """Return the raw content (used for XML parsing if needed)."""
-        if self.is_xml:
-            return self._data
-        return json.dumps(self._data)
+        if self._content is None:
+            if self._raw is not None:
+                self._content = decompress(self._raw, self.codec)
+            elif self._tree is not None:
+                self._content = etree.tostring(self._tree)
+            else:
+                self._content = json.dumps(self._data).encode()
+            self._size = len(self._content)
+        return self._content
+
+    @property
+    def raw(self) -> Union[bytes, str]:
+        """The body as stored, compressed with `codec` if set."""
+        return self._raw if self._raw is not None else self.content
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the decoded body, which is what a cached response holds once it
+        was parsed. A compressed body is measured chunk by chunk."""
+        if self._size is None:
+            if self.codec and self._raw is not None:
+                self._size = sum(len(chunk) for chunk in iter_decompress(self._raw, self.codec))
+            else:
+                self._size = len(self.content)
+                if self._raw is None:
+                    self._content = None  # Serialized only to be measured
+        return self._size
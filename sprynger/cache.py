@@ -0,0 +1,75 @@
+"""
+Module to manage the cache of sprynger.
+
+The size of the cache can be bounded per API with `MaxBytes` and `MaxEntries` in the
+`[Cache]` section of the configuration. The limits are enforced on every write; use
+`prune()` to apply them to pages written by other processes or after lowering them.
+With `MemoryEntries` set, decoded responses are also held in memory; `stats()` reports
+how often they were used. `revalidation_stats()` reports how many of the refreshed
+pages actually changed.
+
+Example:
+    >>> import sprynger
+    >>> sprynger.init()
+    >>> sprynger.cache.prune()
+    >>> sprynger.cache.stats()
+"""
+import threading
+from typing import Optional, Union
+
+from sprynger.utils.cache import REVALIDATIONS, get_cache_store, get_memory_cache
+from sprynger.utils.constants import FORMAT
+from sprynger.utils.data_structures import CacheStats, RevalidationStats
+from sprynger.utils.startup import get_config
+
+
+def prune(api: Optional[str] = None, background: bool = False) -> Union[int, threading.Thread]:
+    """Evict the least recently used pages until the cache is within its limits.
+    With the SQLite backend the pages whose TTL has passed are deleted as well.
+
+    Args:
+        api (str): API whose cache to prune ('Meta', 'Metadata' or 'OpenAccess').
+            Defaults to all APIs.
+        background (bool): Prune in a daemon thread and return it instead of waiting.
+            Defaults to False.
+
+    Returns:
+        int | Thread: The number of pages deleted, or the pruning thread if `background`.
+    """
+    if background:
+        thread = threading.Thread(target=prune, args=(api,), name='sprynger-prune', daemon=True)
+        thread.start()
+        return thread
+
+    config = get_config()
+    stores = []
+    for name in ([api] if api else FORMAT):
+        store = get_cache_store(config, name, FORMAT[name])
+        if store not in stores:  # The SQLite store is shared by all APIs
+            stores.append(store)
+    return sum(store.prune() for store in stores)
+
+
+def stats() -> CacheStats:
+    """Hits and misses of the in-memory cache, and the number of responses and bytes it holds.
+    All values are 0 if the in-memory cache is disabled (`MemoryEntries = 0`)."""
+    memory = get_memory_cache(get_config())
+    return memory.stats() if memory is not None else CacheStats(0, 0, 0, 0)
+
+
+def clear_memory() -> None:
+    """Drop the responses held in memory and reset the counters."""
+    memory = get_memory_cache(get_config())
+    if memory is not None:
+        memory.clear()
+
+
+def revalidation_stats(reset: bool = False) -> RevalidationStats:
+    """Number of cached pages fetched again since the start (or the last reset), and
+    how many of them were modified. Unmodified pages are answered with 304 or have the
+    same body as before, and are not written again.
+
+    Args:
+        reset (bool): Reset the counts after reading them. Defaults to False.
+    """
+    return REVALIDATIONS.stats(reset)
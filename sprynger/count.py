@@ -0,0 +1,45 @@
+"""
+Module with the count function to get the number of results of a query without
+retrieving its records.
+
+Example:
+    >>> from sprynger import count
+    >>> count(issn='2196-0089', api='OpenAccess')
+"""
+from typing import Literal
+
+from sprynger.meta import Meta
+from sprynger.metadata import Metadata
+from sprynger.openaccess import OpenAccess
+
+
+def count(query: str = '',
+          api: Literal['Metadata', 'Meta', 'OpenAccess'] = 'Meta',
+          premium: bool = False,
+          cache: bool = True,
+          refresh: bool = False,
+          **kwargs) -> int:
+    """Number of results of a query.
+
+    Only one record is requested and only the total of the response is parsed, which
+    is much cheaper than `OpenAccess(...).documents_found` or `Meta(...).results.total`
+    for JATS pages. Counts are cached apart from the pages, for `CountTTL` days (see
+    the `[Cache]` section of the configuration).
+
+    Args:
+        query (str): The query to search for.
+        api (str): API to query ('Meta', 'Metadata' or 'OpenAccess'). Defaults to 'Meta'.
+        premium (bool): Whether the user has a premium account. Defaults to False.
+        cache (bool): Whether to use the cached counts. Defaults to True.
+        refresh (bool): Whether to count again even if a cached count is fresh.
+            Defaults to False.
+        kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
+
+    Returns:
+        int: The number of results.
+    """
+    classes = {'Meta': Meta, 'Metadata': Metadata, 'OpenAccess': OpenAccess}
+    if api not in classes:
+        raise ValueError(f'Unknown API: {api}. Use one of {", ".join(classes)}.')
+    retriever = classes[api]._unfetched(query, kwargs, api, premium, cache, refresh)
+    return retriever._count()
@@ -13,6 +13,18 @@ class MissingAPIKeyError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class CorruptCacheError(Exception):
+    """Exception raised when a cache entry is truncated or can't be decoded."""
+    def __init__(self, message="Corrupt cache entry."):
+        self.message = message
+        super().__init__(self.message)
+
+class CacheMissError(Exception):
+    """Exception raised in offline mode when a page is not in the cache."""
+    def __init__(self, message="Page not cached and requests are disabled (offline mode)."):
+        self.message = message
+        super().__init__(self.message)
+
 class AuthenticationError(APIError):
     """Exception raised for 401/403 Authentication Failures"""
     def __init__(self, status_code, message="Authentication failed. Check your API key."):
@@ -41,3 +53,13 @@ class InternalServerError(APIError):
     """Exception raised for 500 Internal Server Error"""
     def __init__(self, status_code, message="Internal server error. Try again later."):
         super().__init__(status_code, message)
+
+
+class CircuitOpenError(APIError):
+    """Exception raised when requests are suspended because the API keeps failing"""
+    def __init__(self, retry_in: float, message=None):
+        self.retry_in = retry_in
+        if message is None:
+            message = (f"Requests suspended after repeated API errors. "
+                       f"Retry in {retry_in:.0f} seconds.")
+        super().__init__(503, message)
@@ -0,0 +1,130 @@
+"""
+Module with the Harvest class to retrieve all the results of a large query in a
+resumable way.
+
+Example:
+    >>> from sprynger import Harvest, OpenAccess
+    >>> job = Harvest(OpenAccess, 'harvest.json', issn='2196-0089')
+    >>> for document in job:
+    >>>     print(document.doi)
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional, Type, Union
+
+from sprynger.retrieve import Retrieve
+from sprynger.utils.constants import LIMIT
+
+
+class Harvest:
+    """Retrieve all the results of a query page by page, saving the progress to a
+    checkpoint file after every page.
+
+    A job started again with the same checkpoint file continues with the first page
+    that was not completely processed. The checkpoint is replaced atomically, so the
+    process can be killed at any time: at worst the page being processed is handed
+    out again. All pages are requested with the full page size, so that also the
+    last page keeps its cache key while the results grow.
+    """
+    def __init__(self,
+                 cls: Type[Retrieve],
+                 checkpoint: Union[str, Path],
+                 query: str = '',
+                 premium: bool = False,
+                 cache: bool = True,
+                 refresh: Union[bool, int, str] = False,
+                 **kwargs) -> None:
+        """
+        Args:
+            cls (Type[Retrieve]): Class of the API to harvest (`Meta`, `Metadata` or `OpenAccess`).
+            checkpoint (str|Path): Path of the checkpoint file. It is created if missing.
+            query (str): The query to search for.
+            premium (bool): Whether the user has a premium account. Defaults to False.
+            cache (bool): Whether to cache the results. Defaults to True.
+            refresh (bool|int|str): Whether to refresh the cache, as in the constructor
+                of `cls`. Defaults to False.
+            kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
+
+        Raises:
+            ValueError: If the checkpoint file belongs to another query.
+        """
+        self.checkpoint = Path(checkpoint)
+        plan = 'Premium' if premium else 'Basic'
+        page_size = LIMIT[plan][cls.__name__]
+        self._retriever = cls._unfetched(query, kwargs, cls.__name__, premium, cache, refresh,
+                                         nr_results=page_size)
+
+        self.api = cls.__name__
+        self.query = self._retriever._query
+        self.page_size = page_size
+        self.next_start = 1
+        self.total: Optional[int] = None
+        self.pages_done = 0
+        self._load_checkpoint()
+
+    @property
+    def done(self) -> bool:
+        """Whether all the results were processed."""
+        return self.total is not None and self.next_start > self.total
+
+    def pages(self) -> Iterator[list]:
+        """Yield the parsed records (or documents) of each remaining page. A page
+        counts as processed once the next one is requested."""
+        while not self.done:
+            res = self._retriever._fetch_or_load(self.next_start, self.page_size)
+            total = self._retriever._get_total_results(res)
+            documents = self._retriever._parse_response(res)
+            if total < self.next_start or not documents:
+                # No more results than found so far (e.g. the results shrank)
+                self.total = min(total, self.next_start - 1)
+                self._save_checkpoint()
+                return
+            yield documents
+            self.total = total
+            self.next_start += self.page_size
+            self.pages_done += 1
+            self._save_checkpoint()
+
+    def __iter__(self) -> Iterator:
+        for documents in self.pages():
+            yield from documents
+
+    def _load_checkpoint(self) -> None:
+        """Continue from the checkpoint file, if it exists."""
+        if not self.checkpoint.exists():
+            return
+        with open(self.checkpoint, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if (state['api'], state['query'], state['page_size']) != (self.api, self.query, self.page_size):
+            raise ValueError(f'Checkpoint {self.checkpoint} belongs to another harvest: '
+                             f'{state["api"]} {state["query"]!r}.')
+        self.next_start = state['next_start']
+        self.total = state['total']
+        self.pages_done = state['pages_done']
+
+    def _save_checkpoint(self) -> None:
+        """Replace the checkpoint file with the current progress."""
+        state = {'api': self.api,
+                 'query': self.query,
+                 'page_size': self.page_size,
+                 'next_start': self.next_start,
+                 'total': self.total,
+                 'pages_done': self.pages_done}
+        directory = self.checkpoint.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename it, so that a kill never leaves a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{self.checkpoint.name}.',
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.checkpoint)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __repr__(self) -> str:
+        return (f'Harvest({self.api}, {self.query!r}: {self.pages_done} pages done, '
+                f'next start {self.next_start} of {self.total})')
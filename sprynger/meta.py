@@ -1,15 +1,16 @@
 """
 Module with Meta class.
 """
-from typing import Union
+from typing import Optional, Union
 
-from sprynger.metadata import Metadata
+from sprynger.metadata import Metadata, MetadataParser
 from sprynger.utils.data_structures import MetadataCreator, MetaDiscipline, MetaRecord, MetaURL
 from sprynger.utils.parse import make_int_if_possible, str_to_bool
 
 
-class Meta(Metadata):
-    """Class to retreive the metadata of a document from the Springer Meta v2 API."""
+class MetaParser(MetadataParser):
+    """Properties and parsers of the responses of the Meta v2 API, shared by `Meta`
+    and `AsyncMeta`."""
     @property
     def records(self) -> list[MetaRecord]:
         """Contains the individual records that matched the query.
@@ -25,6 +26,10 @@ class Meta(Metadata):
             `copyright`, `abstract`, `conferenceInfo`, 
             `keyword`, `subjects` and `disciplines`.
         """
+        return self._parse_records(self._json)
+
+    def _parse_records(self, data: dict) -> list[MetaRecord]:
+        """Auxiliary method to parse the records of a JSON response."""
         def parse_urls(urls):
             return [MetaURL(format=url.get('format'), platform=url.get('platform'), value=url.get('value')) for url in urls]
 
@@ -35,7 +40,7 @@ class Meta(Metadata):
             return [MetaDiscipline(id=discipline.get('id'), term=discipline.get('term')) for discipline in disciplines]
 
         records_list = []
-        for record in self._json.get('records', []):
+        for record in data.get('records', []):
             urls = parse_urls(record.get('url', []))
             creators = parse_creators(record.get('creators', []))
             disciplines = parse_disciplines(record.get('disciplines', []))
@@ -75,13 +80,17 @@ class Meta(Metadata):
             )
         return records_list
 
+
+class Meta(MetaParser, Metadata):
+    """Class to retreive the metadata of a document from the Springer Meta v2 API."""
     def __init__(self,
                  query: str = '',
                  start: int = 1,
                  nr_results: int = 10,
                  premium: bool = False,
                  cache: bool = True,
-                 refresh: Union[bool, int] = False,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
                  **kwargs):
         """
         Args:
@@ -90,8 +99,12 @@ class Meta(Metadata):
             nr_results (int): The number of results to retrieve. Defaults to 10.
             premium (bool): Whether the user has a premium account. Defaults to False.
             cache (bool): Whether to cache the results. Defaults to True.
-            refresh (bool|int): Weather to refresh the cache. If an integer is provided, 
-                it will be used as the cache expiration time in days. Defaults to False.
+            refresh (bool|int|str): Weather to refresh the cache. If an integer is provided, 
+                it will be used as the cache expiration time in days.
+                With 'swr', stale pages are served at once and refreshed in the
+                background. Defaults to False.
+            workers (int): Number of pages to fetch in parallel. Defaults to the
+                `Concurrency` value in the `[Requests]` section of the configuration.
             kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.). For a comprehensive list of
                 available fields, see the 
                 `Springer Metadata API documentation <https://dev.springernature.com/docs/supported-query-params/>`_.
@@ -117,6 +130,7 @@ class Meta(Metadata):
                          premium=premium,
                          cache=cache,
                          refresh=refresh,
+                         workers=workers,
                          **kwargs)
         self._nr_results = nr_results
         self._records = self.records
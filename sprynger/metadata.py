@@ -1,9 +1,10 @@
 """
 Module with Metadata class.
 """
-from typing import Union
+from typing import Optional, Union
 import warnings
 
+from sprynger.base import _to_json
 from sprynger.retrieve import Retrieve
 from sprynger.utils.data_structures import (MetadataCreator,
                                             MetadataFacets,
@@ -12,8 +13,9 @@ from sprynger.utils.data_structures import (MetadataCreator,
 from sprynger.utils.parse import make_int_if_possible, str_to_bool
 
 
-class Metadata(Retrieve):
-    """Class to retreive the metadata of a document from the Springer Metadata API."""
+class MetadataParser:
+    """Properties and parsers of the responses of the Metadata API, shared by
+    `Metadata` and the async clients."""
     @property
     def facets(self) -> list[MetadataFacets]:
         """Faceted information about the results.
@@ -68,8 +70,16 @@ class Metadata(Retrieve):
             `publicationType`, `issn`, `volume`, `number`, `genre`, `startingPage`, 
             `endingPage`, `journalId`, `copyright`, `abstract` and `subjects`.
         """
+        return self._parse_records(self._json)
+
+    def _parse_response(self, res) -> list[MetadataRecord]:
+        """Auxiliary method to parse the records of a response."""
+        return self._parse_records(_to_json(res))
+
+    def _parse_records(self, data: dict) -> list[MetadataRecord]:
+        """Auxiliary method to parse the records of a JSON response."""
         records_list = []
-        for record in self._json.get('records', []):
+        for record in data.get('records', []):
             url = record.get('url', {})[0].get('value')
             url_format = record.get('url', {})[0].get('format')
             url_platform = record.get('url', {})[0].get('platform')
@@ -109,13 +119,17 @@ class Metadata(Retrieve):
             )
         return records_list
 
+
+class Metadata(MetadataParser, Retrieve):
+    """Class to retreive the metadata of a document from the Springer Metadata API."""
     def __init__(self,
                  query: str = '',
                  start: int = 1,
                  nr_results: int = 10,
                  premium: bool = False,
                  cache: bool = True,
-                 refresh: Union[bool, int] = False,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
                  **kwargs):
         """
         Args:
@@ -124,8 +138,12 @@ class Metadata(Retrieve):
             nr_results (int): The number of results to retrieve. Defaults to 10.
             premium (bool): Whether the user has a premium account. Defaults to False.
             cache (bool): Whether to cache the results. Defaults to True.
-            refresh (bool|int): Weather to refresh the cache. If an integer is provided, 
-                it will be used as the cache expiration time in days. Defaults to False.
+            refresh (bool|int|str): Weather to refresh the cache. If an integer is provided, 
+                it will be used as the cache expiration time in days.
+                With 'swr', stale pages are served at once and refreshed in the
+                background. Defaults to False.
+            workers (int): Number of pages to fetch in parallel. Defaults to the
+                `Concurrency` value in the `[Requests]` section of the configuration.
             kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.). For a comprehensive list of
                 available fields, see the 
                 `Springer Metadata API documentation <https://dev.springernature.com/docs/supported-query-params/>`_.
@@ -160,6 +178,7 @@ class Metadata(Retrieve):
                          premium=premium,
                          cache=cache,
                          refresh=refresh,
+                         workers=workers,
                          **kwargs)
         self._nr_results = nr_results
         self._records = self.records
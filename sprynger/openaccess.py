@@ -22,24 +22,32 @@ Example:
 
 
 """
-from typing import Union
+from typing import Optional, Union
 
+from lxml.etree import _Element
+
+from sprynger.base import _to_xml
 from sprynger.retrieve import Retrieve
 from sprynger.openaccess_article import Article
 from sprynger.openaccess_chapter import Chapter
 
 
-class OpenAccess(Retrieve):
-    """Retrieve Open Access documents from Springer Nature API."""
+class OpenAccessParser:
+    """Properties and parsers of the responses of the Open Access API, shared by
+    `OpenAccess` and `AsyncOpenAccess`."""
     @property
     def documents_found(self) -> int:
-        """Number of documents found."""
+        """Number of documents found (0 before anything was fetched)."""
+        if self._res is None:
+            return 0
         return self._get_total_results()
 
-    def _get_documents(self) -> list[Union[Chapter, Article]]:
+    def _get_documents(self, xml: Optional[_Element] = None) -> list[Union[Chapter, Article]]:
         """Auxiliary method to retrieve the documents from the Open Access API."""
+        if xml is None:
+            xml = self._xml
         documents = []
-        for record in self._xml.find('.//records'):
+        for record in xml.find('.//records'):
             if record.tag == 'book-part-wrapper':
                 documents.append(Chapter(record))
             elif record.tag == 'article':
@@ -48,11 +56,18 @@ class OpenAccess(Retrieve):
                 raise ValueError(f'Unknown document type: {record.tag}')
         return documents
 
+    def _parse_response(self, res) -> list[Union[Chapter, Article]]:
+        """Auxiliary method to parse the documents of a response."""
+        return self._get_documents(_to_xml(res))
+
     @property
     def xml(self) -> str:
         """Raw XML response from the Open Access API."""
         return self._xml
 
+
+class OpenAccess(OpenAccessParser, Retrieve):
+    """Retrieve Open Access documents from Springer Nature API."""
     def __init__(
         self,
         query: str = '',
@@ -60,7 +75,8 @@ class OpenAccess(Retrieve):
         nr_results: int = 10,
         premium: bool = False,
         cache: bool = True,
-        refresh: Union[bool, int] = False,
+        refresh: Union[bool, int, str] = False,
+        workers: Optional[int] = None,
         **kwargs,
     ) -> None:
         """
@@ -70,7 +86,9 @@ class OpenAccess(Retrieve):
             nr_results (int): Number of results to retrieve.
             premium (bool): Use the premium API.
             cache (bool): Use the cache.
-            refresh (Union[bool, int]): Refresh the cache.
+            refresh (Union[bool, int, str]): Refresh the cache. With 'swr' stale pages
+                are served and refreshed in the background.
+            workers (Optional[int]): Number of pages to fetch in parallel.
             **kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
                 For a comprehensive list of available fields, see the 
                 `Springer Metadata API documentation <https://dev.springernature.com/docs/supported-query-params/>`_.
@@ -89,6 +107,7 @@ class OpenAccess(Retrieve):
                          premium=premium,
                          cache=cache,
                          refresh=refresh,
+                         workers=workers,
                          **kwargs)
         self.documents = self._get_documents()
 
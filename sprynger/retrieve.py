@@ -1,12 +1,51 @@
 """Module with the Retrieval Class"""
-from typing import Optional, Literal, Union
+from abc import ABC, abstractmethod
+import sys
+from typing import Iterable, Iterator, Optional, Literal, Union
 
 from sprynger.base import Base
-from sprynger.utils.constants import VALID_FIELDS
+from sprynger.exceptions import CacheMissError
+from sprynger.utils.constants import LIMIT, VALID_FIELDS
+from sprynger.utils.data_structures import DOILookup
+from sprynger.utils.parse import chained_get
+from sprynger.utils.startup import get_config
 
 
-class Retrieve(Base):
-    """Retrieve data from the Springer API."""
+# Spelling of the fields by their lower case name
+CANONICAL_FIELDS = {field.lower(): field for field in VALID_FIELDS}
+
+
+def _normalize_whitespace(text: str) -> str:
+    """Strip the text and collapse runs of whitespace into single spaces."""
+    return ' '.join(text.split())
+
+
+class QueryBuilder:
+    """Validate the query and build it from the keyword arguments."""
+    def _make_query(self,
+                    query: str,
+                    kwargs: Optional[dict],
+                    api: Literal['OpenAccess', 'Meta', 'Metadata'],
+                    premium: bool) -> str:
+        """Validate the query and kwargs and join them into a single, canonical query string.
+
+        The same search always gives the same string (and so the same cache key):
+        whitespace is normalized, field names are spelled as in the documentation and
+        the filters are deduplicated and sorted.
+        """
+        plan = 'Premium' if premium else 'Basic'
+        kwargs = self._canonical_fields(kwargs)
+        self._check_query(query, kwargs, api, plan)
+        filters = self._build_filters(kwargs)
+        return self._and_join(_normalize_whitespace(query), filters)
+
+    def _canonical_fields(self, kwargs: Optional[dict]) -> Optional[dict]:
+        """Spell the field names as in VALID_FIELDS, whatever their case."""
+        if not kwargs:
+            return kwargs
+        return {CANONICAL_FIELDS.get(field.lower(), field): value
+                for field, value in kwargs.items()}
+
     def _check_query(self,
                     query: str,
                     kwargs: Optional[dict],
@@ -40,15 +79,14 @@ class Retrieve(Base):
 
 
     def _build_filters(self, kwargs: dict) -> str:
-        """Auxiliary function to build filters for the query."""
-        filters = ''
+        """Auxiliary function to build filters for the query. The filters are
+        deduplicated and sorted, so their order in kwargs doesn't matter."""
+        filters = set()
         if kwargs:
             for field, value in kwargs.items():
-                if isinstance(value, list):
-                    filters += ' '.join(f'{field}:{v}' for v in value)
-                else:
-                    filters = self._and_join(filters, f'{field}:{value}')
-        return filters
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                filters.update(f'{field}:{_normalize_whitespace(str(v))}' for v in values)
+        return ' '.join(sorted(filters))
 
     def _and_join(self,
                   str1: str,
@@ -59,6 +97,8 @@ class Retrieve(Base):
         return str1 or str2
 
 
+class Retrieve(QueryBuilder, Base, ABC):
+    """Retrieve data from the Springer API."""
     def __init__(self,
                  query: str,
                  api: Literal['Metadata', 'Meta', 'OpenAccess'],
@@ -66,14 +106,12 @@ class Retrieve(Base):
                  nr_results: int = 10,
                  premium: bool = False,
                  cache: bool = True,
-                 refresh: Union[bool, int] = False,
+                 refresh: Union[bool, int, str] = False,
+                 workers: Optional[int] = None,
                  **kwargs):
         """This class handles the query to retrieve the data from the Springer API."""
 
-        plan = 'Premium' if premium else 'Basic'
-        self._check_query(query, kwargs, api, plan)
-        filters = self._build_filters(kwargs)
-        query = self._and_join(query, filters)
+        query = self._make_query(query, kwargs, api, premium)
 
         super().__init__(query=query,
                          api=api,
@@ -81,4 +119,152 @@ class Retrieve(Base):
                          nr_results=nr_results,
                          premium=premium,
                          cache=cache,
-                         refresh=refresh)
+                         refresh=refresh,
+                         workers=workers)
+
+    @classmethod
+    def lookup_dois(cls,
+                    dois: Iterable[str],
+                    premium: bool = False,
+                    cache: bool = True,
+                    refresh: Union[bool, int, str] = False) -> DOILookup:
+        """Retrieve many documents by DOI with as few requests as possible.
+
+        The DOIs are packed into `doi:"A" OR doi:"B" ...` queries of up to one full page
+        each. Every document found is also cached as the response of its single-DOI
+        query, so a later `cls(doi=...)` and the next lookup are served from the cache.
+
+        Args:
+            dois (Iterable[str]): DOIs to retrieve.
+            premium (bool): Whether the user has a premium account. Defaults to False.
+            cache (bool): Whether to cache the results. Defaults to True.
+            refresh (bool|int|str): Whether to refresh the cache. If an integer is provided,
+                it will be used as the cache expiration time in days.
+                With 'swr', stale pages are served at once and refreshed in the
+                background. Defaults to False.
+
+        Returns:
+            DOILookup: The `found` documents (dict of DOI to record or document, in the
+            order given) and the `missing` DOIs which the API did not return.
+
+        Example:
+            >>> lookup = Meta.lookup_dois(['10.1007/s10994-023-06496-y', '10.1186/s13040-023-00352-8'])
+            >>> for doi, record in lookup.found.items():
+            >>>     print(doi, record.title)
+        """
+        # The API (and so the cache directory) is named after the class, see Metadata
+        api = cls.__name__
+        plan = 'Premium' if premium else 'Basic'
+        dois = list(dict.fromkeys(doi.strip() for doi in dois if doi and doi.strip()))
+
+        found = {}
+        to_fetch = []
+        for doi in dois:
+            single = cls._unfetched('', {'doi': doi}, api, premium, cache, refresh)
+            res, _ = single._load_fresh(single._get_cache_key(single._start, single._limit))
+            if res is None:
+                to_fetch.append(doi)
+                continue
+            documents = single._parse_response(res)
+            if documents:
+                found[doi] = documents[0]
+
+        page_size = LIMIT[plan][api]
+        for i in range(0, len(to_fetch), page_size):
+            chunk = to_fetch[i:i + page_size]
+            query = ' OR '.join(f'doi:"{doi}"' for doi in chunk)
+            # Only the single-DOI responses are cached, the batch pages are never reused
+            batch = cls._unfetched(query, None, api, premium, False, refresh,
+                                   nr_results=len(chunk))
+            try:
+                res = batch._fetch_or_load(batch._start, batch._limit)
+            except CacheMissError:
+                continue  # Offline, the DOIs of the chunk are missing
+            records = {}
+            for record in batch._response_records(res):
+                doi = batch._record_doi(record)
+                if doi:
+                    records[doi.lower()] = record
+
+            for doi in chunk:
+                record = records.get(doi.lower())
+                if record is None:
+                    continue
+                single = cls._unfetched('', {'doi': doi}, api, premium, cache, refresh)
+                single_res = single._make_response([record], total=1)
+                if cache:
+                    single._write_cache(single_res, single._get_cache_key(single._start,
+                                                                          single._limit))
+                found[doi] = single._parse_response(single_res)[0]
+
+        return DOILookup(found={doi: found[doi] for doi in dois if doi in found},
+                         missing=[doi for doi in dois if doi not in found])
+
+    @classmethod
+    def stream(cls,
+               query: str = '',
+               start: int = 1,
+               nr_results: Optional[int] = None,
+               premium: bool = False,
+               cache: bool = True,
+               refresh: Union[bool, int, str] = False,
+               prefetch: Optional[int] = None,
+               **kwargs) -> Iterator:
+        """Iterate over the results of a query, fetching each page only when the
+        previous one was consumed. Only one page is held in memory at a time.
+
+        Args:
+            query (str): The query to search for.
+            start (int): The starting index for the results. Defaults to 1.
+            nr_results (int): The number of results to retrieve. Defaults to all results.
+            premium (bool): Whether the user has a premium account. Defaults to False.
+            cache (bool): Whether to cache the results. Defaults to True.
+            refresh (bool|int|str): Whether to refresh the cache, as in the constructor.
+                Defaults to False.
+            prefetch (int): Number of pages fetched ahead in the background while the
+                current page is processed (0 to fetch on demand only). Defaults to the
+                `Prefetch` value in the `[Requests]` section of the configuration.
+            kwargs: Additional fields for query (e.g. issn, datefrom, dateto, etc.).
+
+        Yields:
+            The records (Meta, Metadata) or documents (OpenAccess) in order.
+
+        Example:
+            >>> for document in OpenAccess.stream(issn='2196-0089'):
+            >>>     print(document.title)
+        """
+        nr_results = sys.maxsize if nr_results is None else nr_results
+        obj = cls._unfetched(query, kwargs, cls.__name__, premium, cache, refresh,
+                             nr_results=nr_results, start=start)
+        if prefetch is None:
+            prefetch = int(chained_get(get_config(), ['Requests', 'Prefetch'], 0))
+        for res in obj._iter_pages(prefetch):
+            yield from obj._parse_response(res)
+
+    @classmethod
+    def _unfetched(cls,
+                   query: str,
+                   kwargs: Optional[dict],
+                   api: str,
+                   premium: bool,
+                   cache: bool,
+                   refresh: Union[bool, int, str],
+                   nr_results: int = 10,
+                   start: int = 1) -> 'Retrieve':
+        """Object set up like `cls(query, start=start, nr_results=nr_results, **kwargs)`
+        (same query, pages and cache files) but without fetching anything."""
+        obj = cls.__new__(cls)
+        query = obj._make_query(query, kwargs, api, premium)
+        obj._setup(query=query,
+                   api=api,
+                   start=start,
+                   nr_results=nr_results,
+                   premium=premium,
+                   cache=cache,
+                   refresh=refresh,
+                   workers=1)
+        return obj
+
+    @abstractmethod
+    def _parse_response(self, res) -> list:
+        """Parse the records or documents of a response."""
@@ -0,0 +1,180 @@
+"""
+Module to split large queries into date windows (shards) that can each be paged
+through completely, and to retrieve them in parallel.
+
+The API only pages to a limited depth, so the results of a query beyond it can't be
+reached with `start`. `plan()` counts the results of a date window with `count()`
+and halves the windows until each one fits under `max_results`.
+`stream()` retrieves the shards in parallel and yields the union of their results,
+without duplicates. The shards are streamed page by page into a bounded queue, so
+only a few pages per worker are held in memory.
+
+Example:
+    >>> from sprynger import OpenAccess, shard
+    >>> shards = shard.plan(OpenAccess, datefrom='2020-01-01', dateto='2024-12-31',
+    >>>                     issn='2196-0089')
+    >>> for document in shard.stream(OpenAccess, shards, issn='2196-0089'):
+    >>>     print(document.doi)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import queue
+import threading
+from typing import Iterable, Iterator, Literal, Optional, Type, Union
+import warnings
+
+from sprynger.count import count
+from sprynger.retrieve import Retrieve
+from sprynger.utils.constants import MAX_DEPTH, SHARD_QUEUE_SIZE
+from sprynger.utils.data_structures import Shard
+from sprynger.utils.parse import chained_get
+from sprynger.utils.startup import get_config
+
+
+def plan(cls: Type[Retrieve],
+         datefrom: str,
+         dateto: str,
+         query: str = '',
+         date_field: Literal['date', 'onlinedate'] = 'date',
+         max_results: int = MAX_DEPTH,
+         premium: bool = False,
+         cache: bool = True,
+         refresh: bool = False,
+         **kwargs) -> list[Shard]:
+    """Split the query into date windows with at most `max_results` results each.
+
+    Args:
+        cls (Type[Retrieve]): Class of the API (`Meta`, `Metadata` or `OpenAccess`).
+        datefrom (str): First day of the query (YYYY-MM-DD).
+        dateto (str): Last day of the query (YYYY-MM-DD).
+        query (str): The query to search for.
+        date_field (str): Date the windows apply to: the publication date ('date',
+            with the fields `datefrom`/`dateto`) or the online date ('onlinedate',
+            with `onlinedatefrom`/`onlinedateto`). Defaults to 'date'.
+        max_results (int): Maximum number of results of a shard. Defaults to the
+            deepest result the API pages to.
+        premium (bool): Whether the user has a premium account. Defaults to False.
+        cache (bool): Whether to use the cached counts. Defaults to True.
+        refresh (bool): Whether to count again even if a cached count is fresh.
+            Defaults to False.
+        kwargs: Additional fields for query (e.g. issn, subject, etc.).
+
+    Returns:
+        list[Shard]: The non-empty windows in date order, with their number of results.
+    """
+    def count_window(first: date, last: date) -> int:
+        window = {**kwargs, **_window_fields(date_field, first, last)}
+        return count(query, api=cls.__name__, premium=premium, cache=cache, refresh=refresh,
+                     **window)
+
+    shards = []
+    windows = [(date.fromisoformat(datefrom), date.fromisoformat(dateto))]
+    while windows:
+        first, last = windows.pop()
+        total = count_window(first, last)
+        if total == 0:
+            continue
+        if total <= max_results or first == last:
+            if total > max_results:
+                warnings.warn(f'{total} results on {first} exceed {max_results}, '
+                              'only the first ones can be retrieved.', UserWarning)
+            shards.append(Shard(datefrom=first.isoformat(), dateto=last.isoformat(),
+                                total=total))
+            continue
+        middle = first + (last - first) // 2
+        # The earlier half is popped first
+        windows.append((middle + timedelta(days=1), last))
+        windows.append((first, middle))
+    return shards
+
+
+def stream(cls: Type[Retrieve],
+           shards: Iterable[Shard],
+           query: str = '',
+           date_field: Literal['date', 'onlinedate'] = 'date',
+           premium: bool = False,
+           cache: bool = True,
+           refresh: Union[bool, int, str] = False,
+           workers: Optional[int] = None,
+           **kwargs) -> Iterator:
+    """Retrieve the shards in parallel and yield their records (or documents). Records
+    found in several shards are yielded once, by DOI.
+
+    Args:
+        cls (Type[Retrieve]): Class of the API (`Meta`, `Metadata` or `OpenAccess`).
+        shards (Iterable[Shard]): Date windows, as returned by `plan()`.
+        query (str): The query to search for, as passed to `plan()`.
+        date_field (str): Date the windows apply to, as passed to `plan()`.
+        premium (bool): Whether the user has a premium account. Defaults to False.
+        cache (bool): Whether to cache the results. Defaults to True.
+        refresh (bool|int|str): Whether to refresh the cache. Defaults to False.
+        workers (int): Number of shards retrieved in parallel. Defaults to the
+            `Concurrency` value in the `[Requests]` section of the configuration.
+        kwargs: Additional fields for query, as passed to `plan()`.
+
+    Yields:
+        The records or documents of the shards, as soon as their page is retrieved.
+        Shards retrieved in parallel are interleaved.
+    """
+    if workers is None:
+        workers = int(chained_get(get_config(), ['Requests', 'Concurrency'], 1))
+    shards = list(shards)
+    items = queue.Queue(maxsize=SHARD_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        """Hand an item to the consumer. False once the consumer stopped."""
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def retrieve(shard: Shard) -> None:
+        window = {**kwargs, **_window_fields(date_field, date.fromisoformat(shard.datefrom),
+                                             date.fromisoformat(shard.dateto))}
+        try:
+            for document in cls.stream(query, nr_results=shard.total, premium=premium,
+                                       cache=cache, refresh=refresh, **window):
+                if not put(document):
+                    return
+        except Exception as e:  # pylint: disable=broad-except
+            put(e)  # Raised by the consumer
+        put(_SHARD_DONE)
+
+    seen = set()
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='sprynger-shard')
+    try:
+        for shard in shards:
+            executor.submit(retrieve, shard)
+        remaining = len(shards)
+        while remaining:
+            document = items.get()
+            if document is _SHARD_DONE:
+                remaining -= 1
+                continue
+            if isinstance(document, Exception):
+                raise document
+            doi = getattr(document, 'doi', None)
+            if doi:
+                if doi.lower() in seen:
+                    continue
+                seen.add(doi.lower())
+            yield document
+    finally:
+        # Also when the consumer stops early: the workers stop at their next record
+        stopped.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Put in the queue by a worker once its shard was retrieved completely
+_SHARD_DONE = object()
+
+
+def _window_fields(date_field: str, first: date, last: date) -> dict:
+    """Query fields restricting the results to a date window."""
+    if date_field not in ('date', 'onlinedate'):
+        raise ValueError(f"Unknown date field: {date_field}. Use 'date' or 'onlinedate'.")
+    return {f'{date_field}from': first.isoformat(), f'{date_field}to': last.isoformat()}
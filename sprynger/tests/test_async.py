@@ -0,0 +1,161 @@
+"""Tests for the asynchronous clients with a stub transport."""
+import asyncio
+import os
+import time
+
+import pytest
+
+from sprynger import AsyncMeta, init
+import sprynger.async_base
+import sprynger.base
+from sprynger.tests.test_base import StubMetaAPI
+from sprynger.utils.singleflight import AsyncSingleFlight
+from sprynger.utils.transport import AsyncTransport, TransportResponse, default_transport
+
+
+class StubTransport(AsyncTransport):
+    """Transport answering from the stub Meta API."""
+    def __init__(self, total: int):
+        self.api = StubMetaAPI(total)
+        self.closed = False
+
+    async def get(self, url, params, config):
+        await asyncio.sleep(0)
+        res = self.api(url, params)
+        return TransportResponse(res.status_code, res.content, res.headers)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(name='transport')
+def fixture_transport(tmp_path):
+    """Initialize sprynger with a temporary cache and return a stub transport."""
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           '[RateLimit]\nEnabled = false\n')
+    init(api_key='stub', config_file=config_file)
+    return StubTransport(total=60)
+
+
+def test_create(transport):
+    """Test that all the pages are fetched and merged in order."""
+    meta = asyncio.run(AsyncMeta.create('stub', nr_results=55, workers=3, transport=transport))
+    assert sorted(transport.api.calls) == [(1, 25), (26, 25), (51, 5)]
+    assert [r.doi for r in meta] == [f'10.1000/{i}' for i in range(1, 56)]
+    assert meta.results.total == 60
+    assert not transport.closed
+
+
+def test_async_iteration(transport):
+    """Test that the pages are fetched while iterating."""
+    meta = AsyncMeta('stub', nr_results=30, transport=transport)
+    async def collect():
+        return [r.doi async for r in meta]
+
+    assert asyncio.run(collect()) == [f'10.1000/{i}' for i in range(1, 31)]
+    assert transport.api.calls == [(1, 25), (26, 5)]
+    # After a complete iteration the object holds all the pages
+    assert len(meta) == 30
+    assert len(meta.records) == 30
+    assert meta.results.recordsRetrieved == 30
+
+
+def test_stale_while_revalidate(transport, monkeypatch):
+    """Test that stale pages are refreshed by a task of the loop through the transport."""
+    meta = asyncio.run(AsyncMeta.create('stub', nr_results=5, transport=transport))
+    cache_file = meta._store.path(meta._get_cache_key(1, 5))
+    os.utime(cache_file, (time.time() - 2 * 86400,) * 2)
+    def blocking_fetch(*args, **kwargs):
+        raise AssertionError('The refresh must not use the blocking client')
+    monkeypatch.setattr(sprynger.base, 'fetch_data', blocking_fetch)
+    transport.api.total = 3
+
+    async def run():
+        meta = await AsyncMeta.create('stub', nr_results=5, refresh='swr', transport=transport)
+        await asyncio.gather(*sprynger.async_base._REVALIDATE_TASKS)
+        return meta
+
+    assert len(asyncio.run(run())) == 5
+    assert len(transport.api.calls) == 2
+    assert not sprynger.base._REVALIDATING
+    meta = asyncio.run(AsyncMeta.create('stub', nr_results=5, refresh='swr', transport=transport))
+    assert len(meta) == 3
+
+
+def test_before_create(transport):
+    """Test that the parsed properties are empty before anything is fetched."""
+    meta = AsyncMeta('stub', transport=transport)
+    assert meta.results.total == 0
+    assert meta.records == []
+    assert len(meta) == 0
+    assert not transport.api.calls
+
+
+def test_transport_is_abstract():
+    """Test that a transport must implement `get`."""
+    with pytest.raises(TypeError):
+        AsyncTransport()
+
+
+def test_cache(transport):
+    """Test that the async client reads the pages it cached."""
+    asyncio.run(AsyncMeta.create('stub', nr_results=10, transport=transport))
+    meta = asyncio.run(AsyncMeta.create('stub', nr_results=10, transport=transport))
+    assert len(transport.api.calls) == 1
+    assert len(meta) == 10
+
+
+def test_single_flight_cancelled_caller():
+    """Test that cancelling one caller does not cancel the shared call of the others."""
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'page'
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        follower = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == 'page'
+    assert calls == [1]
+
+
+def test_single_flight_shares_result(transport, monkeypatch):
+    """Test that concurrent identical async queries share one request."""
+    flight = AsyncSingleFlight()
+    arrived = []
+    async def counting_do(key, fn):
+        arrived.append(key)
+        return await flight.do(key, fn)
+    monkeypatch.setattr(sprynger.async_base.ASYNC_SINGLE_FLIGHT, 'do', counting_do)
+
+    stub_get = transport.get
+    async def gated_get(url, params, config):
+        # Answer only once all four queries joined the call
+        while len(arrived) < 4:
+            await asyncio.sleep(0.001)
+        return await stub_get(url, params, config)
+    transport.get = gated_get
+
+    async def run():
+        queries = (AsyncMeta.create('stub', refresh=True, transport=transport) for _ in range(4))
+        return await asyncio.wait_for(asyncio.gather(*queries), timeout=5)
+
+    results = asyncio.run(run())
+    assert transport.api.calls == [(1, 10)]
+    assert [len(meta) for meta in results] == [10] * 4
+
+
+def test_default_transport_is_shared(transport):  # pylint: disable=unused-argument
+    """Test that the async clients share one pooled transport."""
+    assert default_transport() is default_transport()
+    assert AsyncMeta('stub')._transport is AsyncMeta('other')._transport
@@ -0,0 +1,453 @@
+"""Tests for the Base class with a stubbed Springer API."""
+from datetime import date
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from sprynger import Harvest, Meta, OpenAccess, count, init, shard
+from sprynger.exceptions import CacheMissError
+import sprynger.base
+from sprynger.base import MockResponse
+import sprynger.utils.singleflight
+from sprynger.utils.cache import FileCache, decompress, read_entry
+from sprynger.utils.data_structures import CacheStats
+
+
+class StubResponse:
+    """Minimal stand-in for requests.Response."""
+    def __init__(self, data: dict):
+        self.status_code = 200
+        self.headers = {'Content-Type': 'application/json'}
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubMetaAPI:
+    """Stub of the Meta API serving `total` numbered records."""
+    def __init__(self, total: int):
+        self.total = total
+        self.etags = False
+        self.calls = []
+        self.queries = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, url, params, **kwargs):
+        with self._lock:
+            self.calls.append((params['s'], params['p']))
+            self.queries.append(params['q'])
+            self.threads.add(threading.get_ident())
+        start, limit = params['s'], params['p']
+        # Record i was published on day i of 2024
+        numbers = list(range(1, self.total + 1))
+        for bound, day in re.findall(r'\bdate(from|to):(\S+)', params['q']):
+            day = (date.fromisoformat(day) - date(2023, 12, 31)).days
+            numbers = [i for i in numbers if (i >= day if bound == 'from' else i <= day)]
+        total = len(numbers)
+        numbers = numbers[start - 1:start - 1 + limit]
+        if params['q'].startswith('doi:'):
+            dois = [q.removeprefix('doi:').strip('"') for q in params['q'].split(' OR ')]
+            numbers = [int(d.split('/')[1]) for d in dois if int(d.split('/')[1]) <= self.total]
+            total = len(numbers)
+        records = [{'doi': f'10.1000/{i}', 'identifier': f'doi:10.1000/{i}',
+                    'openaccess': 'true'} for i in numbers]
+        data = {'result': [{'total': str(total), 'start': str(start),
+                            'pageLength': str(limit), 'recordsDisplayed': str(len(records))}],
+                'records': records,
+                'facets': []}
+        res = StubResponse(data)
+        if self.etags:
+            res.headers['ETag'] = f'"{hashlib.md5(res.content).hexdigest()}"'
+            if (kwargs.get('headers') or {}).get('If-None-Match') == res.headers['ETag']:
+                res.status_code, res.content = 304, b''
+        return res
+
+
+@pytest.fixture(name='api')
+def fixture_api(monkeypatch, tmp_path):
+    """Initialize sprynger with a temporary cache and a stubbed API."""
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           f'[Cache]\nCountsPath = "{(tmp_path / "counts.sqlite").as_posix()}"\n')
+    init(api_key='stub', config_file=config_file)
+    stub = StubMetaAPI(total=60)
+    monkeypatch.setattr(sprynger.base, 'fetch_data', stub)
+    return stub
+
+
+def test_pagination(api):
+    """Test that pages are fetched sequentially and merged in order."""
+    meta = Meta('stub', nr_results=55)
+    assert api.calls == [(1, 25), (26, 25), (51, 5)]
+    assert [r.doi for r in meta] == [f'10.1000/{i}' for i in range(1, 56)]
+
+
+def test_concurrent_pagination(api):
+    """Test that parallel pages are merged in page order."""
+    meta = Meta('stub', nr_results=60, workers=3, refresh=True)
+    assert sorted(api.calls) == [(1, 25), (26, 25), (51, 10)]
+    assert [r.doi for r in meta] == [f'10.1000/{i}' for i in range(1, 61)]
+
+
+class CountingEvent(threading.Event):
+    """Event that counts the threads waiting on it."""
+    def __init__(self):
+        super().__init__()
+        self.waiting = threading.Semaphore(0)
+
+    def wait(self, timeout=None):
+        self.waiting.release()
+        return super().wait(timeout)
+
+
+def test_single_flight(api, monkeypatch):
+    """Test that concurrent identical queries share one request."""
+    events = []
+    class CountingCall(sprynger.utils.singleflight._Call):
+        """In-flight call whose followers can be counted."""
+        def __init__(self):
+            super().__init__()
+            self.done = CountingEvent()
+            events.append(self.done)
+    monkeypatch.setattr(sprynger.utils.singleflight, '_Call', CountingCall)
+
+    def gated_api(url, params, **kwargs):
+        # Answer only once the three other threads wait for this call
+        for _ in range(3):
+            assert events[0].waiting.acquire(timeout=5)
+        return api(url, params)
+    monkeypatch.setattr(sprynger.base, 'fetch_data', gated_api)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(Meta('stub', refresh=True)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert api.calls == [(1, 10)]
+    assert [len(meta) for meta in results] == [10] * 4
+
+
+def test_lookup_dois(api, tmp_path):
+    """Test that DOIs are packed into pages and cached for single-DOI queries."""
+    dois = [f'10.1000/{i}' for i in range(1, 31)] + ['10.1000/999']
+    lookup = Meta.lookup_dois(dois)
+    # Only the single-DOI responses are cached, not the batch pages
+    assert len(list((tmp_path / 'meta').glob('*.json'))) == 30
+    assert api.queries[0] == ' OR '.join(f'doi:"{doi}"' for doi in dois[:25])
+    assert len(api.queries) == 2
+    assert list(lookup.found) == dois[:30]
+    assert lookup.found['10.1000/7'].doi == '10.1000/7'
+    assert lookup.missing == ['10.1000/999']
+
+    # Found DOIs are served from the cache, only the missing one is asked again
+    meta = Meta(doi='10.1000/7')
+    lookup = Meta.lookup_dois(['10.1000/3', '10.1000/999'])
+    assert meta[0].doi == '10.1000/7'
+    assert api.queries[2:] == ['doi:"10.1000/999"']
+    assert list(lookup.found) == ['10.1000/3']
+
+
+def test_cache_raw_bytes(api, tmp_path):
+    """Test that the cache keeps the response bytes and reads headerless entries."""
+    meta = Meta('stub', nr_results=5)
+    cache_key = meta._get_cache_key(1, 5)
+    cache_file = meta._store.path(cache_key)
+    header, body = read_entry(cache_file)
+    body = decompress(body, header.get('codec'))
+    assert header['status'] == 200
+    assert header['content_type'] == 'application/json'
+    assert body == api('', {'q': 'stub', 's': 1, 'p': 5}).content
+
+    # Entries written by older versions have no header
+    with open(cache_file, 'wb') as f:
+        f.write(body)
+    res = meta._load_from_cache(cache_key)
+    assert res.json() is res.json()
+    assert [r.doi for r in Meta('stub', nr_results=5)] == [f'10.1000/{i}' for i in range(1, 6)]
+
+
+def test_sqlite_cache(api, tmp_path):
+    """Test that pages are cached in SQLite when it is the configured backend."""
+    config_file = tmp_path / 'sqlite.toml'
+    config_file.write_text(f'[Cache]\nBackend = "sqlite"\n'
+                           f'Path = "{(tmp_path / "cache.sqlite").as_posix()}"\n')
+    init(api_key='stub', config_file=config_file)
+    Meta('stub', nr_results=30)
+    meta = Meta('stub', nr_results=30)
+    assert api.calls == [(1, 25), (26, 5)]
+    assert [r.doi for r in meta] == [f'10.1000/{i}' for i in range(1, 31)]
+    conn = sqlite3.connect(tmp_path / 'cache.sqlite')
+    assert conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0] == 2
+
+
+def test_prune(api, tmp_path):
+    """Test pruning the cache to the configured limits."""
+    Meta('stub', nr_results=30)
+    config_file = tmp_path / 'limits.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           '[Cache.Meta]\nMaxEntries = 1\n')
+    init(api_key='stub', config_file=config_file)
+    assert sprynger.cache.prune() == 1
+    assert len(list((tmp_path / 'meta').glob('*.json'))) == 1
+
+
+def test_memory_cache(api, tmp_path, monkeypatch):
+    """Test that hot pages are served from memory and that refresh bypasses it."""
+    config_file = tmp_path / 'memory.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           '[Cache]\nMemoryEntries = 10\n')
+    init(api_key='stub', config_file=config_file)
+    sprynger.cache.clear_memory()
+    Meta('stub', nr_results=5)
+
+    def fail(*args):
+        raise AssertionError('Read from disk')
+    monkeypatch.setattr(FileCache, 'read', fail)
+    assert [r.doi for r in Meta('stub', nr_results=5)][-1] == '10.1000/5'
+    assert Meta('stub', nr_results=5, refresh=30).records[0].doi == '10.1000/1'
+    Meta('stub', nr_results=5, refresh=True)
+    assert len(api.calls) == 2
+    assert sprynger.cache.stats() == CacheStats(hits=2, misses=2, entries=1,
+                                                bytes=len(api('', {'q': 'stub', 's': 1, 'p': 5}).content))
+
+
+def test_release_raw_keeps_shared_pages(api, tmp_path):
+    """Test that only merged responses drop their raw body, not pages held in memory."""
+    config_file = tmp_path / 'memory.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           '[Cache]\nMemoryEntries = 10\nReleaseRaw = true\n')
+    init(api_key='stub', config_file=config_file)
+    sprynger.cache.clear_memory()
+    meta = Meta('stub', nr_results=5)
+    assert meta._res._raw is not None
+    assert Meta('stub', nr_results=5)._res is meta._res
+    meta = Meta('stub', nr_results=30)
+    assert meta._res._raw is None
+    assert len(meta) == 30
+    assert len(api.calls) == 3
+
+
+def test_record_store(api, tmp_path):
+    """Test that overlapping pages and DOI queries are answered from stored records."""
+    config_file = tmp_path / 'records.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           f'[Cache]\nRecords = true\n'
+                           f'RecordsPath = "{(tmp_path / "records.sqlite").as_posix()}"\n')
+    init(api_key='stub', config_file=config_file)
+    Meta('stub', nr_results=25)
+    n_calls = len(api.calls)
+
+    meta = Meta('stub', start=6, nr_results=10)
+    assert [r.doi for r in meta] == [f'10.1000/{i}' for i in range(6, 16)]
+    assert meta.results.total == 60
+    assert Meta(doi='10.1000/7')[0].doi == '10.1000/7'
+    assert Meta.lookup_dois(['10.1000/8', '10.1000/9']).missing == []
+    assert len(api.calls) == n_calls
+
+    # Pages reaching beyond the stored positions are fetched
+    Meta('stub', start=20, nr_results=10)
+    assert api.calls[n_calls:] == [(20, 10)]
+
+
+def test_fetched_page_is_parsed_once(api, tmp_path, monkeypatch):
+    """Test that the record store and the caller share the parsed body of a page."""
+    config_file = tmp_path / 'records.toml'
+    config_file.write_text(f'[Directories]\nMeta = "{(tmp_path / "meta").as_posix()}"\n'
+                           f'[Cache]\nRecords = true\n'
+                           f'RecordsPath = "{(tmp_path / "records.sqlite").as_posix()}"\n')
+    init(api_key='stub', config_file=config_file)
+    parsed = []
+    loads = sprynger.base.json.loads
+    monkeypatch.setattr(sprynger.base.json, 'loads',
+                        lambda s, **kw: parsed.append(s) or loads(s, **kw))
+    meta = Meta('stub', nr_results=5)
+    assert len(meta) == 5
+    assert len(parsed) == 1
+
+
+def test_corrupt_cache_is_fetched_again(api):
+    """Test that truncated or broken cache entries are fetched again instead of raising."""
+    meta = Meta('stub', nr_results=5)
+    cache_file = meta._store.path(meta._get_cache_key(1, 5))
+    with open(cache_file, 'rb') as f:
+        data = f.read()
+    with open(cache_file, 'wb') as f:
+        f.write(data[:-10])
+    assert len(Meta('stub', nr_results=5)) == 5
+    with open(cache_file, 'wb') as f:
+        f.write(b'{"records": [')  # Entry without header written by an older version
+    assert len(Meta('stub', nr_results=5)) == 5
+    assert len(api.calls) == 3
+    assert len(Meta('stub', nr_results=5)) == 5
+    assert len(api.calls) == 3
+
+
+def test_stale_while_revalidate(api, monkeypatch):
+    """Test that stale pages are served at once and refreshed in the background."""
+    meta = Meta('stub', nr_results=5)
+    cache_file = meta._store.path(meta._get_cache_key(1, 5))
+    os.utime(cache_file, (time.time() - 2 * 86400,) * 2)
+
+    release = threading.Event()
+    def blocked(*args, **kwargs):
+        release.wait(5)
+        return api(*args, **kwargs)
+    monkeypatch.setattr(sprynger.base, 'fetch_data', blocked)
+    api.total = 3
+
+    assert len(Meta('stub', nr_results=5, refresh='swr')) == 5
+    assert len(api.calls) == 1
+    release.set()
+    while sprynger.base._REVALIDATING:
+        time.sleep(0.01)
+    assert len(api.calls) == 2
+    assert len(Meta('stub', nr_results=5, refresh='swr')) == 3
+    assert len(api.calls) == 2
+    with pytest.raises(ValueError):
+        Meta('stub', refresh='always')
+
+
+def test_conditional_refresh(api):
+    """Test that refreshed pages are revalidated and unchanged pages are not rewritten."""
+    api.etags = True
+    meta = Meta('stub', nr_results=5)
+    cache_file = meta._store.path(meta._get_cache_key(1, 5))
+    os.utime(cache_file, (0, 0))
+    with open(cache_file, 'rb') as f:
+        entry = f.read()
+    sprynger.cache.revalidation_stats(reset=True)
+
+    # Answered with 304 Not Modified
+    assert [r.doi for r in Meta('stub', nr_results=5, refresh=True)][-1] == '10.1000/5'
+    # Same body without validators from the API
+    api.etags = False
+    assert len(Meta('stub', nr_results=5, refresh=True)) == 5
+    with open(cache_file, 'rb') as f:
+        assert f.read() == entry
+    assert os.path.getmtime(cache_file) > 0
+
+    api.total = 3
+    assert len(Meta('stub', nr_results=5, refresh=True)) == 3
+    assert sprynger.cache.revalidation_stats() == (3, 1)
+
+
+def test_offline(api, tmp_path):
+    """Test that offline mode serves only from the cache and fails fast on a miss."""
+    Meta('stub', nr_results=5)
+    n_calls = len(api.calls)
+    config_file = tmp_path / 'config.toml'
+    init(api_key='stub', config_file=config_file, offline=True)
+
+    assert len(Meta('stub', nr_results=5, refresh=True)) == 5
+    with pytest.raises(CacheMissError):
+        Meta('stub', nr_results=6)
+    assert Meta.lookup_dois(['10.1000/1']).missing == ['10.1000/1']
+    assert len(api.calls) == n_calls
+
+
+def test_merge_jats_pages(api):
+    """Test that JATS pages are merged once, keeping the records in page order."""
+    oa = OpenAccess._unfetched('stub', None, 'OpenAccess', False, True, False)
+    pages = [MockResponse(f'<response><result><total>6</total></result><records>'
+                          f'<article id="{i}"/><article id="{i + 1}"/></records></response>',
+                          is_xml=True)
+             for i in (1, 3, 5)]
+    merged = sprynger.base._to_xml(oa._merge_responses(pages))
+    assert [a.get('id') for a in merged.find('records')] == ['1', '2', '3', '4', '5', '6']
+    assert merged.find('result/total').text == '6'
+
+
+def test_stream(api):
+    """Test that streamed pages are fetched only when they are reached."""
+    records = Meta.stream('stub')
+    assert next(records).doi == '10.1000/1'
+    assert api.calls == [(1, 25)]
+    assert [r.doi for r in records][-1] == '10.1000/60'
+    assert api.calls == [(1, 25), (26, 25), (51, 10)]
+    assert [r.doi for r in Meta.stream('stub', start=3, nr_results=2)] == ['10.1000/3', '10.1000/4']
+
+
+def test_stream_prefetch(api):
+    """Test that the next page is fetched in the background, but no further."""
+    records = Meta.stream('stub', prefetch=1)
+    assert next(records).doi == '10.1000/1'
+    deadline = time.time() + 5
+    while len(api.calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert api.calls == [(1, 25), (26, 25)]
+    assert len([next(records) for _ in range(25)]) == 25  # Up to the first record of page 2
+    assert [r.doi for r in records][-1] == '10.1000/60'
+    assert api.calls == [(1, 25), (26, 25), (51, 10)]
+
+
+def test_harvest_resumes(api, tmp_path):
+    """Test that a harvest continues after the last completed page."""
+    checkpoint = tmp_path / 'harvest.json'
+    job = Harvest(Meta, checkpoint, 'stub')
+    pages = job.pages()
+    next(pages)
+    next(pages)
+    del job, pages  # Killed while processing the second page
+
+    job = Harvest(Meta, checkpoint, 'stub')
+    assert (job.next_start, job.pages_done, job.total) == (26, 1, 60)
+    assert [r.doi for r in job][0] == '10.1000/26'
+    assert job.done
+    assert json.loads(checkpoint.read_text())['pages_done'] == 3
+    assert api.calls == [(1, 25), (26, 25), (51, 25)]
+    assert list(Harvest(Meta, checkpoint, 'stub')) == []
+    with pytest.raises(ValueError):
+        Harvest(Meta, checkpoint, 'other')
+
+
+def test_shards(api):
+    """Test that date windows are split until they fit and that their union has no duplicates."""
+    shards = shard.plan(Meta, datefrom='2024-01-01', dateto='2024-03-31', query='stub',
+                        max_results=20)
+    assert all(s.total <= 20 for s in shards)
+    assert sum(s.total for s in shards) == 60
+    assert shards[0].datefrom == '2024-01-01'
+    shards.append(shards[0])
+    dois = [r.doi for r in shard.stream(Meta, shards, query='stub', workers=3)]
+    assert sorted(dois) == sorted(f'10.1000/{i}' for i in range(1, 61))
+
+
+def test_shards_bounded_queue(api, monkeypatch):
+    """Test that shards are streamed through a bounded queue and stop with the consumer."""
+    monkeypatch.setattr(shard, 'SHARD_QUEUE_SIZE', 2)
+    shards = shard.plan(Meta, datefrom='2024-01-01', dateto='2024-03-31', query='stub',
+                        max_results=20)
+    dois = [r.doi for r in shard.stream(Meta, shards, query='stub', workers=2)]
+    assert sorted(dois) == sorted(f'10.1000/{i}' for i in range(1, 61))
+    n_calls = len(api.calls)
+
+    documents = shard.stream(Meta, shards, query='stub', workers=1, refresh=True)
+    next(documents)
+    documents.close()
+    # The worker stopped within its first shard
+    assert len(api.calls) - n_calls < len(shards)
+
+
+def test_count(api, tmp_path):
+    """Test that counts request one record, skip the page cache and are cached apart."""
+    assert count('stub') == 60
+    assert count('stub', datefrom='2024-01-11', dateto='2024-01-20') == 10
+    assert count('stub') == 60
+    assert api.calls == [(1, 1), (1, 1)]
+    assert count('stub', refresh=True) == 60
+    assert len(api.calls) == 3
+    assert list((tmp_path / 'meta').glob('*.json')) == []
+    # JATS responses are parsed only up to the total
+    truncated = b'<response><result><total>7</total></result><records><article>'
+    assert sprynger.base._parse_total(truncated, is_xml=True) == 7
@@ -0,0 +1,195 @@
+"""Tests for the cache stores."""
+import sqlite3
+import time
+
+import pytest
+
+from sprynger.base import MockResponse, _to_xml
+from sprynger.exceptions import CorruptCacheError
+from sprynger.utils.cache import (FileCache, MemoryCache, SQLiteCache, compress, decompress,
+                                  iter_decompress, read_entry, zstandard)
+
+
+def test_file_cache(tmp_path):
+    """Test that the file store keeps the body behind a header."""
+    store = FileCache(str(tmp_path), 'json')
+    key = ('Meta', 'doi:10.1000/1', 1, 10)
+    assert store.fetched_at(key) is None
+    store.write(key, b'{"records": []}', status=200, content_type='application/json')
+    header, body = read_entry(store.path(key))
+    assert body == b'{"records": []}'
+    assert header['content_type'] == 'application/json'
+    assert store.fetched_at(key) <= time.time()
+
+
+def test_sqlite_cache(tmp_path):
+    """Test writing, reading and expiring pages in the SQLite store."""
+    store = SQLiteCache(str(tmp_path / 'cache.sqlite'))
+    key = ('Meta', 'doi:10.1000/1', 1, 10)
+    assert store.fetched_at(key) is None
+    store.write(key, b'{"records": []}', content_type='application/json', ttl=-1)
+    store.write(('Meta', 'stub', 1, 25), b'{}')
+    header, body = store.read(key)
+    assert body == b'{"records": []}'
+    assert header['status'] == 200
+    assert store.delete_expired() == 1
+    assert store.fetched_at(key) is None
+    assert store.fetched_at(('Meta', 'stub', 1, 25)) is not None
+
+    conn = sqlite3.connect(tmp_path / 'cache.sqlite')
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list('responses')")}
+    assert {'responses_fetched_at', 'responses_ttl'} <= indexes
+
+
+def test_file_cache_lru_eviction(tmp_path):
+    """Test that writes beyond the limit evict the least recently read files."""
+    store = FileCache(str(tmp_path), 'json', max_entries=3)
+    keys = [('Meta', 'stub', start, 10) for start in range(1, 5)]
+    for key in keys[:3]:
+        store.write(key, b'{}')
+        time.sleep(0.01)
+    store.read(keys[0])
+    store.write(keys[3], b'{}')
+    cached = [store.fetched_at(key) is not None for key in keys]
+    assert cached == [True, False, True, True]
+
+
+def test_file_cache_prune(tmp_path):
+    """Test that pruning applies the byte limit to files written by others."""
+    FileCache(str(tmp_path), 'json').write(('Meta', 'a', 1, 10), b'x' * 100)
+    FileCache(str(tmp_path), 'json').write(('Meta', 'b', 1, 10), b'x' * 100)
+    file_size = next(tmp_path.glob('*.json')).stat().st_size
+    store = FileCache(str(tmp_path), 'json', max_bytes=int(file_size * 1.5))
+    assert store.prune() == 1
+    assert len(list(tmp_path.glob('*.json'))) == 1
+
+
+def test_sqlite_cache_lru_eviction(tmp_path):
+    """Test that the SQLite store evicts the least recently read pages of an API."""
+    store = SQLiteCache(str(tmp_path / 'cache.sqlite'), limits={'Meta': (0, 2)})
+    store.write(('OpenAccess', 'stub', 1, 10), b'<response/>')
+    store.write(('Meta', 'a', 1, 10), b'{}')
+    store.write(('Meta', 'b', 1, 10), b'{}')
+    store.read(('Meta', 'a', 1, 10))
+    store.write(('Meta', 'c', 1, 10), b'{}')
+    assert store.fetched_at(('Meta', 'b', 1, 10)) is None
+    assert store.fetched_at(('Meta', 'a', 1, 10)) is not None
+    assert store.fetched_at(('OpenAccess', 'stub', 1, 10)) is not None
+
+
+def test_reads_without_limits_do_not_write(tmp_path, monkeypatch):
+    """Test that access times are only recorded for APIs with cache limits."""
+    store = SQLiteCache(str(tmp_path / 'cache.sqlite'), limits={'Meta': (0, 2)})
+    store.write(('OpenAccess', 'stub', 1, 10), b'<response/>')
+    store.write(('Meta', 'a', 1, 10), b'{}')
+    query = 'SELECT accessed_at FROM responses WHERE api=?'
+    before = {api: store._connection().execute(query, (api,)).fetchone()[0]
+              for api in ('Meta', 'OpenAccess')}
+    time.sleep(0.01)
+    store.read(('OpenAccess', 'stub', 1, 10))
+    store.read(('Meta', 'a', 1, 10))
+    assert store._connection().execute(query, ('OpenAccess',)).fetchone()[0] == before['OpenAccess']
+    assert store._connection().execute(query, ('Meta',)).fetchone()[0] > before['Meta']
+
+    files = FileCache(str(tmp_path), 'json')
+    files.write(('Meta', 'a', 1, 10), b'{}')
+    touched = []
+    monkeypatch.setattr(files, '_touch', touched.append)
+    files.read(('Meta', 'a', 1, 10))
+    assert not touched
+
+
+def test_memory_cache_limits():
+    """Test that the in-memory cache evicts by entries and bytes in LRU order."""
+    memory = MemoryCache(max_entries=2, max_bytes=100)
+    memory.put('a', 'A', 0.0, 40)
+    memory.put('b', 'B', 0.0, 40)
+    assert memory.get('a') == ('A', 0.0)
+    memory.put('c', 'C', 0.0, 40)
+    assert memory.get('b') is None
+    memory.put('d', 'D', 0.0, 200)
+    assert memory.get('d') is None
+    assert memory.stats().bytes == 80
+
+
+def test_compression():
+    """Test that the codecs round-trip and decompress in chunks."""
+    data = b'<response>' + b'<record>text</record>' * 10000 + b'</response>'
+    codecs = ['zlib', 'gzip'] + (['zstd'] if zstandard is not None else [])
+    for codec in codecs:
+        compressed = compress(data, codec)
+        assert len(compressed) < len(data) / 5
+        assert decompress(compressed, codec) == data
+        assert b''.join(iter_decompress(compressed, codec)) == data
+
+
+def test_compressed_response_size():
+    """Test that a compressed response is sized by its decoded body, which is not kept
+    once it was parsed."""
+    data = b'<response>' + b'<record>text</record>' * 1000 + b'</response>'
+    res = MockResponse(compress(data, 'gzip'), is_xml=True, codec='gzip')
+    assert res.nbytes == len(data)
+    assert res.content == data
+    res.xml()
+    assert res._content is None
+    assert res.nbytes == len(data)
+
+
+def test_compressed_xml_is_parsed_from_chunks(tmp_path):
+    """Test that a compressed JATS page is read back and parsed."""
+    store = FileCache(str(tmp_path), 'jats', codec='gzip')
+    key = ('OpenAccess', 'stub', 1, 20)
+    xml = b'<response><result><total>1</total></result><records/></response>'
+    store.write(key, xml)
+    header, body = store.read(key)
+    assert header['codec'] == 'gzip'
+    res = MockResponse(body, is_xml=True, codec=header['codec'])
+    assert _to_xml(res).find('./result/total').text == '1'
+    assert res.content == xml
+
+
+def test_parsed_response_is_memoized():
+    """Test that a response is parsed once and that its raw body can be released."""
+    xml = b'<response><result><total>1</total></result><records/></response>'
+    res = MockResponse(compress(xml, 'zlib'), is_xml=True, codec='zlib')
+    assert _to_xml(res) is _to_xml(res)
+    res.release_raw()
+    assert res.raw == xml
+    assert _to_xml(res).find('./result/total').text == '1'
+    res = MockResponse(b'{"records": [1]}')
+    assert res.json() is res.json()
+    res.release_raw()
+    assert res.json() == {'records': [1]}
+
+
+def test_truncated_entry(tmp_path):
+    """Test that truncated entries are detected and temporary files don't linger."""
+    store = FileCache(str(tmp_path), 'json')
+    key = ('Meta', 'stub', 1, 10)
+    store.write(key, b'{"records": []}')
+    path = store.path(key)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-3])
+    with pytest.raises(CorruptCacheError):
+        store.read(key)
+    assert [p.name for p in tmp_path.glob('*.tmp')] == []
+
+
+@pytest.mark.parametrize('backend', ['files', 'sqlite'])
+def test_validators(tmp_path, backend):
+    """Test that validators are kept with the page and that unchanged pages can be renewed."""
+    if backend == 'files':
+        store = FileCache(str(tmp_path), 'json')
+    else:
+        store = SQLiteCache(str(tmp_path / 'cache.sqlite'))
+    key = ('Meta', 'stub', 1, 10)
+    assert store.validators(key) == {}
+    store.write(key, b'{}', validators={'etag': '"abc"', 'last_modified': None, 'sha256': '44'})
+    assert store.validators(key) == {'etag': '"abc"', 'sha256': '44'}
+    fetched_at = store.fetched_at(key)
+    time.sleep(0.01)
+    store.mark_fresh(key)
+    assert store.fetched_at(key) > fetched_at
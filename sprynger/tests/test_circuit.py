@@ -0,0 +1,57 @@
+"""Tests for the circuit breaker."""
+import time
+
+import pytest
+
+from sprynger.exceptions import CircuitOpenError
+from sprynger.utils.circuit import CircuitBreaker
+
+
+def test_opens_on_failure_rate():
+    """Test that the breaker opens once the failure rate is reached."""
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, reset_timeout=60)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_request()
+    assert exc_info.value.status_code == 503
+    assert 0 < exc_info.value.retry_in <= 60
+
+
+def test_half_open_trial():
+    """Test that a single trial is let through after the timeout."""
+    breaker = CircuitBreaker(failure_rate=1.0, window=2, min_calls=2, reset_timeout=0.01)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == 'half-open'
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_failed_trial_reopens():
+    """Test that a failed trial opens the breaker again."""
+    breaker = CircuitBreaker(failure_rate=1.0, window=1, min_calls=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+def test_released_trial():
+    """Test that a trial without outcome can be given back."""
+    breaker = CircuitBreaker(failure_rate=1.0, window=1, min_calls=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.before_request()
+    breaker.release_trial()
+    assert breaker.state == 'half-open'
+    assert breaker.before_request()
@@ -0,0 +1,134 @@
+"""Tests for the fetch utilities."""
+import time
+
+import pytest
+
+from sprynger import init
+from sprynger.exceptions import CircuitOpenError, InternalServerError, RateLimitError
+from sprynger.utils.fetch import (SessionPool,
+                                  circuit_state,
+                                  fetch_data,
+                                  get_circuit_breaker,
+                                  retry_delay)
+
+
+def test_session_pool_reuse():
+    """Test that sessions are reused for the same configuration."""
+    with SessionPool() as pool:
+        session = pool.get(max_retries=5, backoff_factor=2.0)
+        assert pool.get(max_retries=5, backoff_factor=2.0) is session
+        assert pool.get(max_retries=3, backoff_factor=2.0) is not session
+        assert len(pool) == 2
+    assert len(pool) == 0
+
+
+def test_session_pool_size():
+    """Test that the pool size is passed to the adapter."""
+    pool = SessionPool()
+    session = pool.get(max_retries=5, backoff_factor=2.0, pool_connections=4, pool_maxsize=8)
+    adapter = session.get_adapter('https://api.springernature.com')
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 8
+    pool.close()
+
+
+class StubResponse:
+    """Minimal stand-in for requests.Response."""
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StubPool:
+    """Session pool whose session answers with the queued responses."""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, *args, **kwargs):
+        """Act as the pool (returning the session) and as the session."""
+        if args and isinstance(args[0], str):
+            self.calls += 1
+            return self.responses.pop(0)
+        return self
+
+
+def test_retry_delay():
+    """Test that Retry-After is honored and capped."""
+    assert retry_delay(StubResponse(429, {'Retry-After': '3'}), 0, 2.0, 60) == 3
+    assert retry_delay(StubResponse(429, {'Retry-After': '120'}), 0, 2.0, 60) == 60
+    assert 2 <= retry_delay(StubResponse(503), 2, 1.0, 60) <= 4
+
+
+def test_fetch_data_retries_and_opens_circuit(tmp_path):
+    """Test that failed requests are retried and open the circuit."""
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text('[Requests]\nRetries = 2\n'
+                           '[RateLimit]\nEnabled = false\n'
+                           '[CircuitBreaker]\nMinCalls = 3\nWindow = 3\nResetTimeout = 0.5\n')
+    init(api_key='stub', config_file=config_file)
+    get_circuit_breaker().reset()
+
+    pool = StubPool([StubResponse(503, {'Retry-After': '0'}), StubResponse(200)])
+    assert fetch_data('http://stub', {}, session_pool=pool).status_code == 200
+    assert pool.calls == 2
+
+    get_circuit_breaker().reset()
+    pool = StubPool([StubResponse(500, {'Retry-After': '0'})] * 3)
+    with pytest.raises(InternalServerError):
+        fetch_data('http://stub', {}, session_pool=pool)
+    assert circuit_state() == 'open'
+    with pytest.raises(CircuitOpenError):
+        fetch_data('http://stub', {}, session_pool=StubPool([StubResponse(200)]))
+    time.sleep(0.5)
+    assert fetch_data('http://stub', {}, session_pool=StubPool([StubResponse(200)])).status_code == 200
+    assert circuit_state() == 'closed'
+
+
+
+def _init_breaker(tmp_path, extra=''):
+    """Initialize sprynger with a small, freshly reset circuit breaker."""
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text('[Requests]\nRetries = 0\nBackoffMax = 0\n'
+                           '[CircuitBreaker]\nMinCalls = 1\nWindow = 1\nResetTimeout = 0.05\n'
+                           + extra)
+    init(api_key='stub', config_file=config_file)
+    get_circuit_breaker().reset()
+
+
+def test_rate_limited_responses_do_not_open_circuit(tmp_path):
+    """Test that 429 responses are retried without tripping the breaker."""
+    _init_breaker(tmp_path, '[RateLimit]\nEnabled = false\n')
+    for _ in range(3):
+        with pytest.raises(RateLimitError):
+            fetch_data('http://stub', {}, session_pool=StubPool([StubResponse(429)]))
+    assert circuit_state() == 'closed'
+
+
+def test_trial_released_when_quota_used_up(tmp_path):
+    """Test that a half-open breaker is not stuck when no trial request is sent."""
+    _init_breaker(tmp_path, '[RateLimit.Basic]\nPerDay = 1\nBurst = 5\n')
+    pool = StubPool([StubResponse(500)])
+    with pytest.raises(InternalServerError):
+        fetch_data('http://stub', {'api_key': 'quota-key'}, session_pool=pool)
+    time.sleep(0.06)
+    assert circuit_state() == 'half-open'
+
+    # The daily quota is used up before the trial request is sent
+    with pytest.raises(RateLimitError, match='Daily quota'):
+        fetch_data('http://stub', {'api_key': 'quota-key'}, session_pool=StubPool([]))
+    pool = StubPool([StubResponse(200)])
+    assert fetch_data('http://stub', {'api_key': 'other-key'}, session_pool=pool).status_code == 200
+    assert circuit_state() == 'closed'
+
+
+def test_trial_released_on_unexpected_error(tmp_path):
+    """Test that the trial is given back when the request raises an unexpected error."""
+    _init_breaker(tmp_path, '[RateLimit]\nEnabled = false\n')
+    with pytest.raises(InternalServerError):
+        fetch_data('http://stub', {}, session_pool=StubPool([StubResponse(500)]))
+    time.sleep(0.06)
+    with pytest.raises(IndexError):
+        fetch_data('http://stub', {}, session_pool=StubPool([]))
+    assert circuit_state() == 'half-open'
+    assert fetch_data('http://stub', {}, session_pool=StubPool([StubResponse(200)])).status_code == 200
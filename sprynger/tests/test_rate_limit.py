@@ -0,0 +1,50 @@
+"""Tests for the client-side rate limiter."""
+import os
+
+import pytest
+
+from sprynger.exceptions import RateLimitError
+from sprynger.utils.rate_limit import RateLimiter, get_rate_limiter
+
+
+def test_burst_and_refill():
+    """Test that the burst is available at once and then tokens refill."""
+    limiter = RateLimiter(per_second=10, burst=3)
+    assert [limiter.try_acquire() for _ in range(3)] == [0, 0, 0]
+    wait = limiter.try_acquire()
+    assert 0 < wait <= 0.1
+    limiter.acquire()
+
+
+def test_daily_quota():
+    """Test that the daily quota raises a RateLimitError."""
+    limiter = RateLimiter(per_second=100, burst=5, per_day=2)
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(RateLimitError, match='Daily quota of 2 requests used up'):
+        limiter.acquire()
+
+
+def test_shared_state_file(tmp_path):
+    """Test that limiters with the same state file share the bucket."""
+    state_file = str(tmp_path / 'bucket.json')
+    first = RateLimiter(per_second=0.01, burst=2, state_file=state_file)
+    second = RateLimiter(per_second=0.01, burst=2, state_file=state_file)
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == 0
+    assert first.try_acquire() > 0
+
+
+def test_registry():
+    """Test that limiters are shared per API key and plan."""
+    limiter = get_rate_limiter('key', 'Basic', per_second=1.0)
+    assert get_rate_limiter('key', 'Basic', per_second=1.0) is limiter
+    assert get_rate_limiter('key', 'Premium', per_second=1.0) is not limiter
+
+
+def test_state_dir_created(tmp_path):
+    """Test that a missing state directory is created."""
+    state_dir = tmp_path / 'missing' / 'state'
+    limiter = get_rate_limiter('key', 'Basic', per_second=1.0, state_dir=str(state_dir))
+    assert limiter.try_acquire() == 0
+    assert (state_dir / os.path.basename(limiter.state_file)).exists()
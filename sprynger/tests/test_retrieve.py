@@ -2,23 +2,42 @@
 import pytest
 
 from sprynger import init
-from sprynger.retrieve import Retrieve
+from sprynger.retrieve import QueryBuilder, Retrieve
 
 init()
 
 def test_check_query():
     """Test the _check_query method."""
+    builder = QueryBuilder()
     with pytest.raises(ValueError, match="Please provide a query or kwargs."):
-        Retrieve('', 'OpenAccess')
+        builder._make_query('', None, 'OpenAccess', False)
 
     error_str = f"Invalid field: erroneus_field."
     with pytest.raises(ValueError, match=error_str):
-        Retrieve('', api='Meta', erroneus_field='Neural Network')
+        builder._make_query('', {'erroneus_field': 'Neural Network'}, 'Meta', False)
 
     error_str = f"Field topicalcollection is not available in OpenAccess."
     with pytest.raises(ValueError, match=error_str):
-        Retrieve('', api='OpenAccess', topicalcollection='Neural Network')
+        builder._make_query('', {'topicalcollection': 'Neural Network'}, 'OpenAccess', False)
 
     error_str = f"Field topicalcollection is not available in Basic plan."
     with pytest.raises(ValueError, match=error_str):
-        Retrieve('', api='Meta', premium=False, topicalcollection='Neural Network')
+        builder._make_query('', {'topicalcollection': 'Neural Network'}, 'Meta', False)
+
+
+def test_retrieve_is_abstract():
+    """Test that Retrieve must be subclassed with a response parser."""
+    with pytest.raises(TypeError):
+        Retrieve('Neural Network', 'Meta')
+
+
+def test_canonical_query():
+    """Test that equivalent queries are built into the same string."""
+    builder = QueryBuilder()
+    query = builder._make_query(' Neural   Network ', {'issn': '1573-7497', 'datefrom': '2024-01-01'},
+                                'Meta', False)
+    assert query == 'Neural Network datefrom:2024-01-01 issn:1573-7497'
+    assert builder._make_query('Neural Network', {'DateFrom': ' 2024-01-01', 'ISSN': '1573-7497'},
+                               'Meta', False) == query
+    query = builder._make_query('', {'keyword': ['b', 'a', 'b'], 'doi': '10.1000/1'}, 'Meta', False)
+    assert query == 'doi:10.1000/1 keyword:a keyword:b'
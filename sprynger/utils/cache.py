@@ -0,0 +1,707 @@
+"""Read and write the cached responses of the Springer API.
+
+A cache entry holds the exact bytes returned by the API, preceded by a one-line
+header with the status, content type and fetch time of the response::
+
+    #sprynger-cache {"status": 200, "content_type": "application/json", "fetched_at": "..."}
+    {"apiMessage": ...}
+
+Entries written by older versions have no header and are read as plain bodies.
+The header also holds the validators of the response (`etag`, `last_modified` and
+the `sha256` of the body), used to revalidate the page when it is refreshed.
+The body is compressed with the codec named in the header (`zlib`, `gzip` or `zstd`),
+if any.
+
+The entries are kept by a cache store, selected with `Backend` in the `[Cache]`
+section of the configuration: `FileCache` (one file per page) or `SQLiteCache`
+(one database for all APIs). Both are addressed with the key
+`(api, query, start, limit)` of a page.
+"""
+import contextlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+from math import ceil
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Iterator, Optional, Union
+import zlib
+
+from sprynger.exceptions import CorruptCacheError
+from sprynger.utils.data_structures import CacheStats, RevalidationStats
+from sprynger.utils.lock import file_lock
+from sprynger.utils.parse import chained_get
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+CACHE_MAGIC = b'#sprynger-cache '
+TMP_SUFFIX = '.tmp'
+# Temporary files older than this (in seconds) were left by a crashed writer
+TMP_MAX_AGE = 3600
+# Number of lock files per cache directory, entries hash to one of them
+LOCK_STRIPES = 256
+CODECS = ('none', 'zlib', 'gzip', 'zstd')
+# Size of the compressed chunks fed to the decompressor and the parser
+CHUNK_SIZE = 64 * 1024
+# Header fields used to check whether a cached page changed
+VALIDATORS = ('etag', 'last_modified', 'sha256')
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress a response body with the given codec."""
+    if codec == 'zlib':
+        return zlib.compress(data)
+    if codec == 'gzip':
+        return gzip.compress(data, mtime=0)
+    if codec == 'zstd':
+        return _zstd().ZstdCompressor().compress(data)
+    if codec in ('none', None):
+        return data
+    raise ValueError(f'Unknown compression: {codec}. Use one of {", ".join(CODECS)}.')
+
+
+def iter_decompress(data: bytes, codec: Optional[str]) -> Iterator[bytes]:
+    """Decompress a response body chunk by chunk, without holding it all in memory."""
+    if codec in ('none', None):
+        yield data
+        return
+    if codec in ('zlib', 'gzip'):
+        decompressor = zlib.decompressobj(wbits=31 if codec == 'gzip' else 15)
+    elif codec == 'zstd':
+        decompressor = _zstd().ZstdDecompressor().decompressobj()
+    else:
+        raise ValueError(f'Unknown compression: {codec}. Use one of {", ".join(CODECS)}.')
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield decompressor.decompress(data[i:i + CHUNK_SIZE])
+    if codec != 'zstd':  # The zstd decompressor has nothing left to flush
+        yield decompressor.flush()
+
+
+def decompress(data: bytes, codec: Optional[str]) -> bytes:
+    """Decompress a response body."""
+    if codec in ('none', None):
+        return data
+    return b''.join(iter_decompress(data, codec))
+
+
+def _zstd():
+    """The zstandard module (optional dependency)."""
+    if zstandard is None:
+        raise ModuleNotFoundError('zstd compression requires zstandard. '
+                                  'Install it with `pip install sprynger[zstd]`.')
+    return zstandard
+
+
+def write_entry(path: str,
+                content: Union[bytes, str],
+                status: int = 200,
+                content_type: Optional[str] = None,
+                codec: str = 'none',
+                validators: Optional[dict] = None) -> dict:
+    """Write the (compressed) response body and its header to the cache file.
+    Returns the header."""
+    if isinstance(content, str):
+        content = content.encode()
+    header = {'status': status,
+              'content_type': content_type,
+              'fetched_at': datetime.now(timezone.utc).isoformat()}
+    if codec != 'none':
+        header['codec'] = codec
+    header.update({name: value for name, value in (validators or {}).items() if value})
+    header['length'] = len(content)
+    # Write to a temporary file and rename it, so that readers never see a partial entry
+    directory, file_name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{file_name}.', suffix=TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(CACHE_MAGIC + json.dumps(header).encode() + b'\n')
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return header
+
+
+def read_entry(path: str) -> tuple[dict, bytes]:
+    """Read the header and the response body of a cache file.
+
+    Raises:
+        CorruptCacheError: If the entry is truncated or its header is unreadable.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return split_entry(data)
+
+
+def read_header(path: str) -> dict:
+    """Read only the header of a cache file, empty if it has none.
+
+    Raises:
+        CorruptCacheError: If the header is unreadable.
+    """
+    with open(path, 'rb') as f:
+        line = f.readline()
+    if not line.startswith(CACHE_MAGIC):
+        return {}
+    try:
+        return json.loads(line[len(CACHE_MAGIC):])
+    except ValueError as e:
+        raise CorruptCacheError('Unreadable header of cache entry.') from e
+
+
+def split_entry(data: bytes) -> tuple[dict, bytes]:
+    """Split the bytes of a cache entry into its header and body."""
+    if not data.startswith(CACHE_MAGIC):
+        return {}, data  # Written before headers were introduced
+    header_line, _, body = data.partition(b'\n')
+    try:
+        header = json.loads(header_line[len(CACHE_MAGIC):])
+    except ValueError as e:
+        raise CorruptCacheError('Unreadable header of cache entry.') from e
+    if header.get('length', len(body)) != len(body):
+        raise CorruptCacheError(f'Truncated cache entry: {len(body)} of '
+                                f'{header["length"]} bytes.')
+    return header, body
+
+
+# Eviction frees space down to this share of the limits, so that it doesn't run on every write
+LOW_WATERMARK = 0.9
+
+
+class FileCache:
+    """Cache store with one file per page in the directory of the API.
+
+    If `max_bytes` or `max_entries` is set (0 for no limit), the least recently used
+    pages are evicted when a write exceeds the limit. Reads set the access time of the
+    file explicitly, so the order doesn't depend on how the file system is mounted.
+    """
+    def __init__(self,
+                 directory: str,
+                 extension: str,
+                 max_bytes: int = 0,
+                 max_entries: int = 0,
+                 codec: str = 'none') -> None:
+        self.directory = directory
+        self.extension = extension
+        self.codec = codec
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # Access time and size of the cached files, read from the directory on first eviction
+        self._index: Optional[dict[str, tuple[float, int]]] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: tuple) -> str:
+        """Path of the cache file of a page."""
+        _, query, start, limit = key
+        file_name = hashlib.md5(f'{query}_{start}_{limit}'.encode()).hexdigest()
+        return os.path.join(self.directory, f'{file_name}.{self.extension}')
+
+    def fetched_at(self, key: tuple) -> Optional[float]:
+        """Timestamp of the last fetch of the page, or None if it is not cached."""
+        try:
+            return os.path.getmtime(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def read(self, key: tuple) -> tuple[dict, bytes]:
+        """Header and body of a cached page. The body is still compressed
+        with the codec of the header."""
+        path = self.path(key)
+        entry = read_entry(path)
+        if self.max_bytes or self.max_entries:
+            # Access times only order the evictions
+            self._touch(path)
+        return entry
+
+    def validators(self, key: tuple) -> dict:
+        """Validators of a cached page, empty if it is not cached or has none."""
+        try:
+            header = read_header(self.path(key))
+        except (FileNotFoundError, CorruptCacheError):
+            return {}
+        return {name: header[name] for name in VALIDATORS if header.get(name)}
+
+    def mark_fresh(self, key: tuple) -> None:
+        """Set the fetch time of a page that did not change to now."""
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(self.path(key))
+
+    def write(self,
+              key: tuple,
+              content: Union[bytes, str],
+              status: int = 200,
+              content_type: Optional[str] = None,
+              ttl: Optional[float] = None,
+              validators: Optional[dict] = None) -> None:
+        """Cache the body of a page. The TTL is not stored, files are checked by age."""
+        if isinstance(content, str):
+            content = content.encode()
+        path = self.path(key)
+        content = compress(content, self.codec)
+        # Processes sharing the directory write one entry at a time
+        with file_lock(self._lock_path(path)):
+            write_entry(path, content, status, content_type, self.codec, validators)
+        if self.max_bytes or self.max_entries:
+            with self._lock:
+                self._load_index()
+                self._add(path, time.time(), os.path.getsize(path))
+                self._evict()
+
+    def prune(self) -> int:
+        """Evict the least recently used pages until the limits are met and delete
+        the temporary files left by crashed writers. Returns the number of pages evicted."""
+        now = time.time()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(TMP_SUFFIX) and now - entry.stat().st_mtime > TMP_MAX_AGE:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(entry.path)
+        with self._lock:
+            self._index = None  # Other processes may have written to the directory
+            self._load_index()
+            return self._evict(force=True)
+
+    def _lock_path(self, path: str) -> str:
+        """Lock file guarding the writes of a cache file."""
+        lock_dir = os.path.join(self.directory, '.locks')
+        os.makedirs(lock_dir, exist_ok=True)
+        stripe = int(os.path.basename(path)[:8], 16) % LOCK_STRIPES
+        return os.path.join(lock_dir, f'{stripe:02x}.lock')
+
+    def _touch(self, path: str) -> None:
+        """Mark the file as used now, keeping its modification (fetch) time."""
+        now = time.time()
+        try:
+            os.utime(path, (now, os.path.getmtime(path)))
+        except OSError:
+            return
+        with self._lock:
+            if self._index is not None and path in self._index:
+                self._index[path] = (now, self._index[path][1])
+
+    def _load_index(self) -> None:
+        """Read the access time and size of the cached files (lock must be held)."""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(f'.{self.extension}'):
+                    stat = entry.stat()
+                    self._add(entry.path, stat.st_atime, stat.st_size)
+
+    def _add(self, path: str, accessed_at: float, size: int) -> None:
+        """Add or update a file in the index (lock must be held)."""
+        _, old_size = self._index.get(path, (0, 0))
+        self._index[path] = (accessed_at, size)
+        self._total_bytes += size - old_size
+
+    def _evict(self, force: bool = False) -> int:
+        """Remove the least recently used files if a limit is exceeded (lock must be held)."""
+        if not force and not self._exceeds(self.max_bytes, self.max_entries):
+            return 0
+        max_bytes = int(self.max_bytes * LOW_WATERMARK)
+        max_entries = ceil(self.max_entries * LOW_WATERMARK)
+        evicted = 0
+        for path, (_, size) in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if not self._exceeds(max_bytes, max_entries):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self._index[path]
+            self._total_bytes -= size
+            evicted += 1
+        return evicted
+
+    def _exceeds(self, max_bytes: int, max_entries: int) -> bool:
+        """Whether the cached files exceed the given limits (lock must be held)."""
+        return bool((self.max_bytes and self._total_bytes > max_bytes)
+                    or (self.max_entries and len(self._index) > max_entries))
+
+
+class SQLiteDatabase:
+    """SQLite database with one connection per thread, created with `_SCHEMA`."""
+    _SCHEMA: tuple[str, ...] = ()
+
+    def __init__(self, path: str, wal: bool = True) -> None:
+        self.path = str(path)
+        self.wal = wal
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connection() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread, opened on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            if self.wal:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SQLiteCache(SQLiteDatabase):
+    """Cache store keeping all pages in one SQLite database.
+
+    Pages are keyed by `(api, query, start, limit)`. The fetch time and the TTL (in
+    seconds, NULL if the page does not expire) are indexed columns, so expired pages
+    can be found without reading them. In WAL mode readers do not block the writer,
+    which suits several threads or processes sharing the cache.
+
+    `limits` maps an API to its `(max_bytes, max_entries)`. When a write exceeds them,
+    the least recently read pages of that API are evicted.
+    """
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS responses ('
+        ' api TEXT NOT NULL,'
+        ' query TEXT NOT NULL,'
+        ' start INTEGER NOT NULL,'
+        ' page_size INTEGER NOT NULL,'
+        ' fetched_at REAL NOT NULL,'
+        ' ttl REAL,'
+        ' accessed_at REAL NOT NULL,'
+        ' size INTEGER NOT NULL,'
+        ' status INTEGER,'
+        ' content_type TEXT,'
+        ' codec TEXT,'
+        ' body BLOB NOT NULL,'
+        ' etag TEXT,'
+        ' last_modified TEXT,'
+        ' sha256 TEXT,'
+        ' PRIMARY KEY (api, query, start, page_size))',
+        'CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)',
+        'CREATE INDEX IF NOT EXISTS responses_ttl ON responses (ttl)',
+        'CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (api, accessed_at)',
+    )
+    _WHERE_KEY = 'WHERE api=? AND query=? AND start=? AND page_size=?'
+
+    def __init__(self,
+                 path: str,
+                 wal: bool = True,
+                 limits: Optional[dict[str, tuple[int, int]]] = None,
+                 codec: str = 'none') -> None:
+        super().__init__(path, wal)
+        self.limits = limits or {}
+        self.codec = codec
+        # Number of pages and bytes per API, read from the database on first eviction
+        self._totals: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def fetched_at(self, key: tuple) -> Optional[float]:
+        """Timestamp of the last fetch of the page, or None if it is not cached."""
+        row = self._connection().execute(
+            f'SELECT fetched_at FROM responses {self._WHERE_KEY}', key).fetchone()
+        return row[0] if row else None
+
+    def read(self, key: tuple) -> tuple[dict, bytes]:
+        """Header and body of a cached page. The body is still compressed
+        with the codec of the header."""
+        with self._connection() as conn:
+            row = conn.execute('SELECT status, content_type, fetched_at, codec, body FROM responses '
+                               f'{self._WHERE_KEY}', key).fetchone()
+            if row is None:
+                raise FileNotFoundError(f'Page not cached: {key}')
+            if any(self.limits.get(key[0], (0, 0))):
+                # Access times only order the evictions, without limits reads don't write
+                conn.execute(f'UPDATE responses SET accessed_at=? {self._WHERE_KEY}',
+                             (time.time(), *key))
+        status, content_type, fetched_at, codec, body = row
+        header = {'status': status,
+                  'content_type': content_type,
+                  'fetched_at': datetime.fromtimestamp(fetched_at, timezone.utc).isoformat()}
+        if codec != 'none':
+            header['codec'] = codec
+        return header, bytes(body)
+
+    def validators(self, key: tuple) -> dict:
+        """Validators of a cached page, empty if it is not cached or has none."""
+        row = self._connection().execute(
+            f'SELECT {", ".join(VALIDATORS)} FROM responses {self._WHERE_KEY}', key).fetchone()
+        return {name: value for name, value in zip(VALIDATORS, row or ()) if value}
+
+    def mark_fresh(self, key: tuple) -> None:
+        """Set the fetch time of a page that did not change to now."""
+        with self._connection() as conn:
+            conn.execute(f'UPDATE responses SET fetched_at=? {self._WHERE_KEY}',
+                         (time.time(), *key))
+
+    def write(self,
+              key: tuple,
+              content: Union[bytes, str],
+              status: int = 200,
+              content_type: Optional[str] = None,
+              ttl: Optional[float] = None,
+              validators: Optional[dict] = None) -> None:
+        """Cache the body of a page."""
+        if isinstance(content, str):
+            content = content.encode()
+        content = compress(content, self.codec)
+        validators = validators or {}
+        api = key[0]
+        now = time.time()
+        with self._lock, self._connection() as conn:
+            old = conn.execute(f'SELECT size FROM responses {self._WHERE_KEY}', key).fetchone()
+            conn.execute('INSERT OR REPLACE INTO responses (api, query, start, page_size, '
+                         'fetched_at, ttl, accessed_at, size, status, content_type, codec, body, '
+                         'etag, last_modified, sha256) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (*key, now, ttl, now, len(content), status, content_type, self.codec,
+                          content, *(validators.get(name) for name in VALIDATORS)))
+            if api in self._totals:
+                self._totals[api][0] += 0 if old else 1
+                self._totals[api][1] += len(content) - (old[0] if old else 0)
+            if any(self.limits.get(api, (0, 0))):
+                self._evict(conn, api)
+
+    def delete_expired(self) -> int:
+        """Delete the pages whose TTL has passed. Returns the number of pages deleted."""
+        with self._lock, self._connection() as conn:
+            cursor = conn.execute('DELETE FROM responses '
+                                  'WHERE ttl IS NOT NULL AND fetched_at + ttl < ?', (time.time(),))
+            self._totals.clear()
+            return cursor.rowcount
+
+    def prune(self) -> int:
+        """Delete the expired pages and evict the least recently used pages until the
+        limits are met. Returns the number of pages deleted."""
+        deleted = self.delete_expired()
+        with self._lock, self._connection() as conn:
+            self._totals.clear()  # Other processes may have written to the database
+            for api, limits in self.limits.items():
+                if any(limits):
+                    deleted += self._evict(conn, api, force=True)
+        return deleted
+
+    def _evict(self, conn: sqlite3.Connection, api: str, force: bool = False) -> int:
+        """Delete the least recently read pages of an API if a limit is exceeded
+        (lock must be held)."""
+        if api not in self._totals:
+            n, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses '
+                                   'WHERE api=?', (api,)).fetchone()
+            self._totals[api] = [n, size]
+        totals = self._totals[api]
+        max_bytes, max_entries = self.limits.get(api, (0, 0))
+
+        def exceeds(limit_bytes: int, limit_entries: int) -> bool:
+            return bool((max_bytes and totals[1] > limit_bytes)
+                        or (max_entries and totals[0] > limit_entries))
+
+        if not force and not exceeds(max_bytes, max_entries):
+            return 0
+        max_bytes, max_entries = int(max_bytes * LOW_WATERMARK), ceil(max_entries * LOW_WATERMARK)
+        rowids = []
+        for rowid, size in conn.execute('SELECT rowid, size FROM responses WHERE api=? '
+                                        'ORDER BY accessed_at', (api,)):
+            if not exceeds(max_bytes, max_entries):
+                break
+            rowids.append((rowid,))
+            totals[0] -= 1
+            totals[1] -= size
+        conn.executemany('DELETE FROM responses WHERE rowid=?', rowids)
+        return len(rowids)
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache of decoded responses, in front of the cache store.
+
+    Holds up to `max_entries` responses and, if `max_bytes` is set, up to that many
+    bytes of response bodies. Each entry keeps its fetch time, so that the callers can
+    apply the same freshness rules as for the cache store.
+    """
+    def __init__(self, max_entries: int, max_bytes: int = 0) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[object, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[tuple[object, float]]:
+        """Response and fetch time of a page, or None if it is not held."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, key: tuple, response: object, fetched_at: float, size: int) -> None:
+        """Hold the response of a page, evicting the least recently used ones."""
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (response, fetched_at, size)
+            self._bytes += size
+            while (len(self._entries) > self.max_entries
+                   or (self.max_bytes and self._bytes > self.max_bytes)):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup as hit or miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        """Drop all the responses and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """Hits, misses, entries and bytes held."""
+        with self._lock:
+            return CacheStats(hits=self.hits, misses=self.misses,
+                              entries=len(self._entries), bytes=self._bytes)
+
+
+class CountStore(SQLiteDatabase):
+    """SQLite store of the number of results of each query, apart from the pages."""
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS counts ('
+        ' api TEXT NOT NULL,'
+        ' query TEXT NOT NULL,'
+        ' total INTEGER NOT NULL,'
+        ' fetched_at REAL NOT NULL,'
+        ' PRIMARY KEY (api, query))',
+    )
+
+    def get(self, api: str, query: str) -> Optional[tuple[int, float]]:
+        """Number of results and fetch time of a query, or None if it is not stored."""
+        return self._connection().execute('SELECT total, fetched_at FROM counts '
+                                          'WHERE api=? AND query=?', (api, query)).fetchone()
+
+    def put(self, api: str, query: str, total: int) -> None:
+        """Store the number of results of a query."""
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO counts VALUES (?, ?, ?, ?)',
+                         (api, query, total, time.time()))
+
+
+class RevalidationCounter:
+    """Thread-safe count of the cached pages fetched again, and of those that changed."""
+    def __init__(self) -> None:
+        self.revalidated = 0
+        self.modified = 0
+        self._lock = threading.Lock()
+
+    def record(self, modified: bool) -> None:
+        """Count a revalidated page."""
+        with self._lock:
+            self.revalidated += 1
+            if modified:
+                self.modified += 1
+
+    def stats(self, reset: bool = False) -> RevalidationStats:
+        """Pages revalidated and modified, optionally resetting the counts."""
+        with self._lock:
+            stats = RevalidationStats(revalidated=self.revalidated, modified=self.modified)
+            if reset:
+                self.revalidated = 0
+                self.modified = 0
+            return stats
+
+
+REVALIDATIONS = RevalidationCounter()
+
+_STORES: dict[tuple, Union[FileCache, SQLiteCache]] = {}
+_MEMORY: dict[tuple, MemoryCache] = {}
+_COUNTS: dict[tuple, CountStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_memory_cache(config: dict) -> Optional[MemoryCache]:
+    """In-memory cache as set in the `[Cache]` section, or None if it is disabled."""
+    settings = (int(chained_get(config, ['Cache', 'MemoryEntries'], 0)),
+                int(chained_get(config, ['Cache', 'MemoryBytes'], 0)))
+    if settings[0] <= 0:
+        return None
+    with _STORES_LOCK:
+        memory = _MEMORY.get(settings)
+        if memory is None:
+            memory = MemoryCache(*settings)
+            _MEMORY[settings] = memory
+        return memory
+
+
+def get_count_store(config: dict) -> CountStore:
+    """Store of the result counts as set in the `[Cache]` section."""
+    settings = (str(chained_get(config, ['Cache', 'CountsPath'])),
+                bool(chained_get(config, ['Cache', 'WAL'], True)))
+    with _STORES_LOCK:
+        store = _COUNTS.get(settings)
+        if store is None:
+            store = CountStore(*settings)
+            _COUNTS[settings] = store
+        return store
+
+
+def get_limits(config: dict, api: str) -> tuple[int, int]:
+    """Maximum bytes and entries cached for an API (0 for no limit). The values of the
+    `[Cache]` section can be overridden per API, e.g. in `[Cache.OpenAccess]`."""
+    max_bytes = chained_get(config, ['Cache', api, 'MaxBytes'],
+                            chained_get(config, ['Cache', 'MaxBytes'], 0))
+    max_entries = chained_get(config, ['Cache', api, 'MaxEntries'],
+                              chained_get(config, ['Cache', 'MaxEntries'], 0))
+    return int(max_bytes), int(max_entries)
+
+
+def get_cache_store(config: dict, api: str, extension: str) -> Union[FileCache, SQLiteCache]:
+    """Cache store of an API as set in the `[Cache]` section of the configuration."""
+    backend = chained_get(config, ['Cache', 'Backend'], 'files')
+    codec = chained_get(config, ['Cache', 'Compression'], 'none')
+    if codec not in CODECS:
+        raise ValueError(f'Unknown compression: {codec}. Use one of {", ".join(CODECS)}.')
+    if codec == 'zstd':
+        _zstd()
+    if backend == 'files':
+        settings = (backend, str(chained_get(config, ['Directories', api])), extension,
+                    *get_limits(config, api), codec)
+    elif backend == 'sqlite':
+        limits = tuple((name, get_limits(config, name)) for name in config.get('Directories', {}))
+        settings = (backend, str(chained_get(config, ['Cache', 'Path'])),
+                    bool(chained_get(config, ['Cache', 'WAL'], True)), limits, codec)
+    else:
+        raise ValueError(f'Unknown cache backend: {backend}. Use "files" or "sqlite".')
+    with _STORES_LOCK:
+        store = _STORES.get(settings)
+        if store is None:
+            if backend == 'files':
+                store = FileCache(*settings[1:])
+            else:
+                store = SQLiteCache(settings[1], settings[2], dict(settings[3]), settings[4])
+            _STORES[settings] = store
+        return store
@@ -0,0 +1,118 @@
+"""Circuit breaker that stops sending requests while the Springer API is failing."""
+from collections import deque
+import threading
+import time
+
+from sprynger.exceptions import CircuitOpenError
+
+
+class CircuitBreaker:
+    """Track the outcome of the last requests and fail fast when too many failed.
+
+    The breaker is `closed` while requests go through normally. When the share of
+    failed requests in the sliding `window` reaches `failure_rate` (and at least
+    `min_calls` were made) it `open`s and every request fails fast with a
+    `CircuitOpenError`. After `reset_timeout` seconds it becomes `half-open` and
+    lets a single trial request through: success closes it, failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self,
+                 failure_rate: float = 0.5,
+                 window: int = 20,
+                 min_calls: int = 5,
+                 reset_timeout: float = 30.0) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: `closed`, `open` or `half-open`."""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a trial request through (0 if not open)."""
+        with self._lock:
+            self._update_state()
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self) -> bool:
+        """Check that a request may be sent.
+
+        Returns:
+            bool: True if the request is the trial of a half-open breaker. If no outcome
+            is recorded for it, the trial must be given back with `release_trial()`.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a trial running.
+        """
+        with self._lock:
+            self._update_state()
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            retry_in = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+        raise CircuitOpenError(retry_in)
+
+    def release_trial(self) -> None:
+        """Give back the trial of a half-open breaker without recording an outcome,
+        e.g. when the trial request was not sent or was cancelled."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_running = False
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._trial_running = False
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed request and open the breaker if needed."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            n_failed = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_calls
+                    and n_failed / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def reset(self) -> None:
+        """Close the breaker and forget the recorded outcomes."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._trial_running = False
+            self._outcomes.clear()
+
+    def _open(self) -> None:
+        """Open the breaker (lock must be held)."""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_running = False
+        self._outcomes.clear()
+
+    def _update_state(self) -> None:
+        """Move from open to half-open once the timeout passed (lock must be held)."""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_running = False
@@ -40,12 +40,81 @@ LIMIT = {
     },
 }
 
+# Request rates per plan. `PerSecond` is the sustained rate, `Burst` the number of
+# requests that can be sent at once and `PerDay` the daily quota (0 for no quota).
+RATE_LIMIT = {
+    'Enabled': True,
+    'StateDir': '',
+    'Basic': {
+        'PerSecond': 1.6,
+        'Burst': 10,
+        'PerDay': 0,
+    },
+    'Premium': {
+        'PerSecond': 5.0,
+        'Burst': 25,
+        'PerDay': 0,
+    },
+}
+
 REQUESTS = {
     'Timeout': 20,
     'Retries': 5,
-    'BackoffFactor': 2.0
+    'BackoffFactor': 2.0,
+    'BackoffMax': 60,
+    'PoolConnections': 10,
+    'PoolMaxsize': 10,
+    'Concurrency': 1,
+    'Offline': False,
+    'Prefetch': 0
 }
 
+# The circuit opens when `FailureRate` of the last `Window` requests (at least `MinCalls`)
+# failed and lets a trial request through after `ResetTimeout` seconds.
+CIRCUIT_BREAKER = {
+    'Enabled': True,
+    'FailureRate': 0.5,
+    'Window': 20,
+    'MinCalls': 5,
+    'ResetTimeout': 30.0
+}
+
+# Storage of the cached responses: one file per page in `[Directories]` ('files')
+# or a single SQLite database at `Path` ('sqlite'). `MaxBytes` and `MaxEntries`
+# bound the cache of each API (0 for no limit). `MemoryEntries` responses (0 to
+# disable) and up to `MemoryBytes` are also held in memory. `Compression` is the
+# codec of the cached bodies: 'none', 'zlib', 'gzip' or 'zstd' (needs zstandard).
+# With `Records`, the records of every page are also stored by DOI at `RecordsPath`.
+# With refresh='swr', pages older than `StaleTTL` days are served and then refreshed
+# in the background. With `ReleaseRaw`, query objects drop the raw body of their
+# merged response once it is decoded. The result counts of `count()` are kept at `CountsPath`
+# for `CountTTL` days.
+CACHE = {
+    'Backend': 'files',
+    'Compression': 'zlib',
+    'Path': BASE_PATH/'cache.sqlite',
+    'WAL': True,
+    'MaxBytes': 0,
+    'MaxEntries': 0,
+    'MemoryEntries': 0,
+    'MemoryBytes': 64 * 1024**2,
+    'StaleTTL': 1,
+    'ReleaseRaw': False,
+    'CountTTL': 1,
+    'CountsPath': BASE_PATH/'counts.sqlite',
+    'Records': False,
+    'RecordsPath': BASE_PATH/'records.sqlite',
+}
+
+# Background threads refreshing stale pages with refresh='swr'
+REVALIDATE_WORKERS = 2
+
+# Deepest result (`s` + `p`) the API pages to, larger queries are split into shards
+MAX_DEPTH = 10000
+
+# Records retrieved ahead of the consumer of `shard.stream()`
+SHARD_QUEUE_SIZE = 1000
+
 VALID_FIELDS = {
     "doi": {
         "api": ["Metadata", "OpenAccess", "Meta"],
@@ -6,6 +6,27 @@ def create_namedtuple(name: str, fields: list, defaults=None):
     default_list = [defaults] * len(fields)
     return namedtuple(name, fields, defaults=default_list)
 
+#############################
+#          Lookup           #
+#############################
+fields_doi_lookup = ['found', 'missing']
+DOILookup = create_namedtuple('DOILookup', fields_doi_lookup)
+
+#############################
+#           Cache           #
+#############################
+fields_cache_stats = ['hits', 'misses', 'entries', 'bytes']
+CacheStats = create_namedtuple('CacheStats', fields_cache_stats)
+
+fields_revalidation_stats = ['revalidated', 'modified']
+RevalidationStats = create_namedtuple('RevalidationStats', fields_revalidation_stats)
+
+#############################
+#          Shards           #
+#############################
+fields_shard = ['datefrom', 'dateto', 'total']
+Shard = create_namedtuple('Shard', fields_shard)
+
 #############################
 #          Metadata         #
 #############################
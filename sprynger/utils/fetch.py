@@ -1,10 +1,21 @@
 """Utility functions for fetching data from the Springer API."""
+import asyncio
+import atexit
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+import threading
+import time
+from typing import Optional
+
 from requests.adapters import HTTPAdapter
-from requests import Response, Session
+from requests import RequestException, Response, Session
 from urllib3.util.retry import Retry
 
 from sprynger.utils.startup import get_config
 from sprynger.utils.parse import chained_get
+from sprynger.utils.circuit import CircuitBreaker
+from sprynger.utils.rate_limit import RateLimiter, get_rate_limiter
 
 from sprynger.exceptions import (
     APIError,
@@ -15,23 +26,90 @@ from sprynger.exceptions import (
     ResourceNotFoundError,
 )
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# 429 is back-pressure from the rate limit, not an outage, so it does not trip the circuit
+BREAKER_STATUSES = (500, 502, 503, 504)
+
 
 def create_session(max_retries: int,
-                   backoff_factor: float) -> Session:
+                   backoff_factor: float,
+                   pool_connections: int = 10,
+                   pool_maxsize: int = 10) -> Session:
     """Create a session."""
     session = Session()
+    # Only connection errors are retried here, error statuses are retried in fetch_data
     retries = Retry(total=max_retries,
         backoff_factor=backoff_factor,
         backoff_max=60,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status=0,
         allowed_methods=["GET"]
     )
-    adapter = HTTPAdapter(max_retries=retries)
+    adapter = HTTPAdapter(max_retries=retries,
+                          pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
 
+class SessionPool:
+    """Thread-safe registry of pooled sessions keyed by their configuration.
+
+    Sessions are created on first use and reused afterwards, so that consecutive
+    requests share open connections instead of paying a new handshake each time.
+
+    Example:
+        >>> with SessionPool() as pool:
+        >>>     session = pool.get(max_retries=5, backoff_factor=2.0)
+    """
+    def __init__(self) -> None:
+        self._sessions: dict[tuple, Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self,
+            max_retries: int,
+            backoff_factor: float,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10) -> Session:
+        """Get the session for the given configuration, creating it if necessary."""
+        key = (max_retries, backoff_factor, pool_connections, pool_maxsize)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = create_session(*key)
+                self._sessions[key] = session
+            return session
+
+    def close(self) -> None:
+        """Close all sessions and release their connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __enter__(self) -> 'SessionPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+SESSION_POOL = SessionPool()
+atexit.register(SESSION_POOL.close)
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions, including those of the async clients.
+    They are recreated on the next request."""
+    from sprynger.utils.transport import close_transport_sessions  # Avoid circular import
+    SESSION_POOL.close()
+    close_transport_sessions()
+
+
 def check_response(response: Response) -> None:
     """Check the response."""
     status_code = response.status_code
@@ -45,24 +123,183 @@ def check_response(response: Response) -> None:
         500: InternalServerError
     }
 
-    if status_code != 200:
+    # 304 answers a conditional request for a cached page that did not change
+    if status_code not in (200, 304):
         error_class = error_map.get(status_code, APIError)
         if error_class is APIError:
             raise error_class(status_code, "Unhandled error occurred")
         raise error_class(status_code)
 
 
-def fetch_data(url: str, params: dict) -> Response:
-    """Fetch data from the Springer API."""
-    # Get the configuration
-    config = get_config()
+def get_limiter(config: dict, api_key: str, plan: str) -> Optional[RateLimiter]:
+    """Get the rate limiter of the API key and plan, or None if rate limiting is disabled."""
+    if not chained_get(config, ['RateLimit', 'Enabled'], True):
+        return None
+    per_second = float(chained_get(config, ['RateLimit', plan, 'PerSecond'], 1.0))
+    burst = int(chained_get(config, ['RateLimit', plan, 'Burst'], 1))
+    per_day = int(chained_get(config, ['RateLimit', plan, 'PerDay'], 0)) or None
+    state_dir = chained_get(config, ['RateLimit', 'StateDir']) or None
+    return get_rate_limiter(api_key, plan, per_second, burst, per_day, state_dir)
+
+
+_BREAKERS: dict[tuple, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(config: Optional[dict] = None) -> Optional[CircuitBreaker]:
+    """Get the process-wide circuit breaker, or None if it is disabled."""
+    config = config or get_config()
+    if not chained_get(config, ['CircuitBreaker', 'Enabled'], True):
+        return None
+    settings = (float(chained_get(config, ['CircuitBreaker', 'FailureRate'], 0.5)),
+                int(chained_get(config, ['CircuitBreaker', 'Window'], 20)),
+                int(chained_get(config, ['CircuitBreaker', 'MinCalls'], 5)),
+                float(chained_get(config, ['CircuitBreaker', 'ResetTimeout'], 30.0)))
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(settings)
+        if breaker is None:
+            breaker = CircuitBreaker(*settings)
+            _BREAKERS[settings] = breaker
+        return breaker
+
+
+def circuit_state() -> str:
+    """State of the circuit breaker: `closed` (requests go through), `open` (requests fail
+    fast after repeated API errors) or `half-open` (a trial request is allowed).
+
+    Example:
+        >>> while sprynger.circuit_state() == 'open':
+        >>>     time.sleep(10)
+    """
+    breaker = get_circuit_breaker()
+    return breaker.state if breaker is not None else CircuitBreaker.CLOSED
+
+
+def retry_delay(response, attempt: int, backoff_factor: float, backoff_max: float) -> float:
+    """Seconds to wait before retrying. The `Retry-After` header is honored if present,
+    otherwise the delay grows exponentially with jitter."""
+    retry_after = response.headers.get('Retry-After') if response.headers else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_date = parsedate_to_datetime(retry_after)
+                delay = (retry_date - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(0.0, delay), backoff_max)
+    delay = backoff_factor * (2 ** attempt)
+    return min(random.uniform(delay / 2, delay), backoff_max)
+
+
+def _record_outcome(breaker: Optional[CircuitBreaker], status_code: int) -> bool:
+    """Record the status of a response in the breaker. Returns whether an outcome
+    was recorded (429 responses are not)."""
+    if breaker is None or status_code == 429:
+        return False
+    if status_code in BREAKER_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return True
+
+
+async def _acquire_async(limiter: RateLimiter) -> None:
+    """Take a token from the limiter without blocking the event loop."""
+    while True:
+        if limiter.state_file:
+            # A shared limiter locks and reads its state file, keep that off the event loop
+            wait = await asyncio.to_thread(limiter.try_acquire)
+        else:
+            wait = limiter.try_acquire()
+        if wait <= 0:
+            return
+        await asyncio.sleep(wait)
+
+
+def _get_retry_settings(config: dict) -> tuple[int, float, float]:
+    """Number of retries, backoff factor and maximum backoff from the configuration."""
     max_retries = int(chained_get(config, ['Requests', 'Retries'], 5))
     backoff_factor = float(chained_get(config, ['Requests', 'BackoffFactor'], 2.0))
+    backoff_max = float(chained_get(config, ['Requests', 'BackoffMax'], 60))
+    return max_retries, backoff_factor, backoff_max
+
+
+def fetch_data(url: str,
+               params: dict,
+               plan: str = 'Basic',
+               session_pool: Optional[SessionPool] = None,
+               headers: Optional[dict] = None) -> Response:
+    """Fetch data from the Springer API. `headers` are sent with the request
+    (e.g. `If-None-Match` to revalidate a cached page)."""
+    # Get the configuration
+    config = get_config()
+    max_retries, backoff_factor, backoff_max = _get_retry_settings(config)
     timeout = int(chained_get(config, ['Requests', 'Timeout'], 20))
+    pool_connections = int(chained_get(config, ['Requests', 'PoolConnections'], 10))
+    pool_maxsize = int(chained_get(config, ['Requests', 'PoolMaxsize'], 10))
+
+    limiter = get_limiter(config, params.get('api_key', ''), plan)
+    breaker = get_circuit_breaker(config)
+
+    # Reuse a pooled session and retrieve data
+    pool = session_pool or SESSION_POOL
+    session = pool.get(max_retries, backoff_factor, pool_connections, pool_maxsize)
+    for attempt in range(max_retries + 1):
+        # Wait for the rate limit of the key and plan
+        if limiter is not None:
+            limiter.acquire()
+        trial = breaker.before_request() if breaker is not None else False
+        recorded = False
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+            recorded = _record_outcome(breaker, response.status_code)
+        except RequestException:
+            if breaker is not None:
+                breaker.record_failure()
+                recorded = True
+            raise
+        finally:
+            if trial and not recorded:
+                breaker.release_trial()
+        if response.status_code not in RETRY_STATUSES:
+            break
+        if attempt < max_retries:
+            time.sleep(retry_delay(response, attempt, backoff_factor, backoff_max))
+    check_response(response)
+
+    return response
+
+
+async def fetch_data_async(url: str, params: dict, transport, plan: str = 'Basic'):
+    """Fetch data from the Springer API with an asynchronous transport."""
+    config = get_config()
+    max_retries, backoff_factor, backoff_max = _get_retry_settings(config)
+    limiter = get_limiter(config, params.get('api_key', ''), plan)
+    breaker = get_circuit_breaker(config)
 
-    # Create session and retrieve data
-    session = create_session(max_retries, backoff_factor)
-    response = session.get(url, params=params, timeout=timeout)
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            await _acquire_async(limiter)
+        trial = breaker.before_request() if breaker is not None else False
+        recorded = False
+        try:
+            response = await transport.get(url, params, config)
+            recorded = _record_outcome(breaker, response.status_code)
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+                recorded = True
+            raise
+        finally:
+            if trial and not recorded:
+                breaker.release_trial()
+        if response.status_code not in RETRY_STATUSES:
+            break
+        if attempt < max_retries:
+            await asyncio.sleep(retry_delay(response, attempt, backoff_factor, backoff_max))
     check_response(response)
 
     return response
@@ -27,8 +27,8 @@ def chained_get(data: dict, keys: list, default=None) -> Union[str, int, float]:
         The value at the specified path, or `default` if the path does not exist.
     """
     for key in keys:
-        if isinstance(data, dict):
-            data = data.get(key)
+        if isinstance(data, dict) and key in data:
+            data = data[key]
         else:
             return default
     return data
@@ -0,0 +1,119 @@
+"""Client-side rate limiting of the requests to the Springer API."""
+from contextlib import nullcontext
+from datetime import date
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from sprynger.exceptions import RateLimitError
+from sprynger.utils.lock import file_lock
+
+
+class RateLimiter:
+    """Token bucket limiting the requests per second, plus an optional daily quota.
+
+    The bucket is shared by all threads using the limiter. If a `state_file` is
+    given, the bucket is stored in that file and guarded by an advisory lock, so
+    that several processes draw from the same bucket.
+    """
+    def __init__(self,
+                 per_second: float,
+                 burst: int = 1,
+                 per_day: Optional[int] = None,
+                 state_file: Optional[str] = None) -> None:
+        self.per_second = per_second
+        self.burst = max(1, burst)
+        self.per_day = per_day
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._state = {'tokens': self.burst, 'updated': time.time(),
+                       'day': date.today().isoformat(), 'count': 0}
+
+    def acquire(self) -> None:
+        """Take a token, sleeping until one is available.
+
+        Raises:
+            RateLimitError: If the daily quota is used up.
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.try_acquire()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available and return 0, otherwise
+        return the number of seconds to wait for the next token.
+
+        Raises:
+            RateLimitError: If the daily quota is used up.
+        """
+        lock = file_lock(f'{self.state_file}.lock') if self.state_file else nullcontext()
+        with self._lock, lock:
+            state = self._load_state()
+            now = time.time()
+            today = date.today().isoformat()
+            if state['day'] != today:
+                state['day'], state['count'] = today, 0
+            if self.per_day is not None and state['count'] >= self.per_day:
+                raise RateLimitError(429, f'Daily quota of {self.per_day} requests used up. '
+                                          'Try again tomorrow.')
+
+            elapsed = max(0.0, now - state['updated'])
+            state['tokens'] = min(self.burst, state['tokens'] + elapsed * self.per_second)
+            state['updated'] = now
+            if state['tokens'] >= 1:
+                state['tokens'] -= 1
+                state['count'] += 1
+                wait = 0.0
+            else:
+                wait = (1 - state['tokens']) / self.per_second
+            self._save_state(state)
+        return wait
+
+    def _load_state(self) -> dict:
+        """Read the bucket from the state file, if any."""
+        if self.state_file:
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return dict(self._state)
+        return self._state
+
+    def _save_state(self, state: dict) -> None:
+        """Write the bucket to the state file, if any."""
+        if self.state_file:
+            # Write atomically so a crash never leaves a half-written file
+            tmp_file = f'{self.state_file}.{os.getpid()}.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        else:
+            self._state = state
+
+
+_LIMITERS: dict[tuple, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(api_key: str,
+                     plan: str,
+                     per_second: float,
+                     burst: int = 1,
+                     per_day: Optional[int] = None,
+                     state_dir: Optional[str] = None) -> RateLimiter:
+    """Get the limiter of an API key and plan, creating it on first use."""
+    key_hash = hashlib.md5(f'{api_key}_{plan}'.encode()).hexdigest()
+    registry_key = (key_hash, per_second, burst, per_day, state_dir)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(registry_key)
+        if limiter is None:
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+            state_file = os.path.join(state_dir, f'{key_hash}.json') if state_dir else None
+            limiter = RateLimiter(per_second, burst, per_day, state_file)
+            _LIMITERS[registry_key] = limiter
+        return limiter
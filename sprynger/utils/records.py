@@ -0,0 +1,115 @@
+"""Store of the individual records returned by the Springer API, keyed by DOI.
+
+Every fetched page is split into its records, which are stored once per API and DOI,
+and into the positions of those records in the results of the query. This allows
+answering DOI queries and pages of a query that overlap already fetched ones (e.g.
+another `start` or `nr_results`) without new requests.
+"""
+import threading
+import time
+from typing import Optional
+
+from sprynger.utils.cache import SQLiteDatabase
+from sprynger.utils.parse import chained_get
+
+
+class RecordStore(SQLiteDatabase):
+    """SQLite store of records and of their positions in the results of each query.
+
+    The `envelope` of a query is its response without the records (e.g. the facets),
+    from which pages are rebuilt.
+    """
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS records ('
+        ' api TEXT NOT NULL,'
+        ' doi TEXT NOT NULL,'
+        ' fetched_at REAL NOT NULL,'
+        ' body BLOB NOT NULL,'
+        ' PRIMARY KEY (api, doi))',
+        'CREATE TABLE IF NOT EXISTS queries ('
+        ' api TEXT NOT NULL,'
+        ' query TEXT NOT NULL,'
+        ' total INTEGER NOT NULL,'
+        ' fetched_at REAL NOT NULL,'
+        ' envelope BLOB NOT NULL,'
+        ' PRIMARY KEY (api, query))',
+        'CREATE TABLE IF NOT EXISTS positions ('
+        ' api TEXT NOT NULL,'
+        ' query TEXT NOT NULL,'
+        ' position INTEGER NOT NULL,'
+        ' doi TEXT NOT NULL,'
+        ' fetched_at REAL NOT NULL,'
+        ' PRIMARY KEY (api, query, position))',
+    )
+
+    def add_page(self,
+                 api: str,
+                 query: str,
+                 start: int,
+                 total: int,
+                 envelope: bytes,
+                 records: list[tuple[str, bytes]]) -> None:
+        """Store the records of a page and their positions, starting at `start`."""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute('SELECT total FROM queries WHERE api=? AND query=?',
+                               (api, query)).fetchone()
+            if row is not None and row[0] != total:
+                # The results changed, the positions of the other pages are outdated
+                conn.execute('DELETE FROM positions WHERE api=? AND query=?', (api, query))
+            conn.execute('INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?, ?)',
+                         (api, query, total, now, envelope))
+            conn.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                             [(api, doi.lower(), now, body) for doi, body in records])
+            conn.executemany('INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?)',
+                             [(api, query, start + i, doi.lower(), now)
+                              for i, (doi, _) in enumerate(records)])
+
+    def get_page(self,
+                 api: str,
+                 query: str,
+                 start: int,
+                 limit: int) -> Optional[tuple[int, bytes, float, list[bytes]]]:
+        """Total, envelope, fetch time (of the oldest position) and records of a page,
+        or None if not all of its records are stored."""
+        conn = self._connection()
+        row = conn.execute('SELECT total, fetched_at, envelope FROM queries '
+                           'WHERE api=? AND query=?', (api, query)).fetchone()
+        if row is None:
+            return None
+        total, fetched_at, envelope = row
+        end = min(start + limit - 1, total)
+        rows = conn.execute('SELECT p.fetched_at, r.body FROM positions p '
+                            'JOIN records r ON r.api = p.api AND r.doi = p.doi '
+                            'WHERE p.api=? AND p.query=? AND p.position BETWEEN ? AND ? '
+                            'ORDER BY p.position', (api, query, start, end)).fetchall()
+        if len(rows) != max(0, end - start + 1):
+            return None
+        if rows:
+            fetched_at = min(position_fetched_at for position_fetched_at, _ in rows)
+        # Empty pages have no positions and use the time the query was last fetched
+        return total, bytes(envelope), fetched_at, [bytes(body) for _, body in rows]
+
+    def get_record(self, api: str, doi: str) -> Optional[tuple[bytes, float]]:
+        """Body and fetch time of the record of a DOI, or None if it is not stored."""
+        row = self._connection().execute('SELECT body, fetched_at FROM records '
+                                         'WHERE api=? AND doi=?', (api, doi.lower())).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+
+_RECORD_STORES: dict[tuple, RecordStore] = {}
+_RECORD_STORES_LOCK = threading.Lock()
+
+
+def get_record_store(config: dict) -> Optional[RecordStore]:
+    """Record store as set in the `[Cache]` section, or None if it is disabled."""
+    if not chained_get(config, ['Cache', 'Records'], False):
+        return None
+    settings = (str(chained_get(config, ['Cache', 'RecordsPath'])),
+                bool(chained_get(config, ['Cache', 'WAL'], True)))
+    with _RECORD_STORES_LOCK:
+        store = _RECORD_STORES.get(settings)
+        if store is None:
+            store = RecordStore(*settings)
+            _RECORD_STORES[settings] = store
+        return store
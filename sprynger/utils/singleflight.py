@@ -0,0 +1,76 @@
+"""Coalesce identical concurrent calls into a single call."""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    """An in-flight call and its outcome."""
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time. Callers arriving while the call for
+    their key is in flight wait for it and share its result (or its exception)."""
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Call `fn` unless a call with the same key is in flight, then return its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """Asyncio version of `SingleFlight` for coroutines running in the same event loop.
+
+    The shared call runs in its own task, so cancelling one caller (e.g. through a
+    timeout) does not cancel the call for the other callers.
+    """
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()` unless a call with the same key is in flight, then return its result."""
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved when all callers were cancelled
+
+
+SINGLE_FLIGHT = SingleFlight()
+ASYNC_SINGLE_FLIGHT = AsyncSingleFlight()
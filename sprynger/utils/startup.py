@@ -6,11 +6,12 @@ except ModuleNotFoundError:
 
 import os
 
+from copy import deepcopy
 from pathlib import Path
 from typing import Optional, Union
 
 from sprynger.exceptions import MissingAPIKeyError
-from sprynger.utils.constants import DEFAULT_PATHS, REQUESTS
+from sprynger.utils.constants import CACHE, CIRCUIT_BREAKER, DEFAULT_PATHS, RATE_LIMIT, REQUESTS
 
 API_KEYS = None
 CONFIG = None
@@ -19,7 +20,8 @@ CONFIG = None
 def init(api_key: Optional[str] = None,
          api_key_meta: Optional[str] = None,
          api_key_oa: Optional[str] = None,
-         config_file: Optional[Union[str, Path]] = None) -> None:
+         config_file: Optional[Union[str, Path]] = None,
+         offline: Optional[bool] = None) -> None:
     """
     Function to initialize the sprynger library. For more information go to the
     `documentation <file:///Users/nilsherrmann/sprynger/docs/build/html/initialization.html#configuration>`_.
@@ -29,6 +31,8 @@ def init(api_key: Optional[str] = None,
         api_key_meta (str): API key for Meta API
         api_key_oa (str): API key for OpenAccess API
         config_file (str): Path to the configuration .toml file.
+        offline (bool): Serve only from the cache and never send requests. Overrides
+            `Offline` in the `[Requests]` section of the configuration.
         
     
     Raises:
@@ -56,6 +60,8 @@ def init(api_key: Optional[str] = None,
         with open(config_file, 'rb') as f:
             custom_config = tomllib.load(f)
         _merge_dicts(CONFIG, custom_config)
+    if offline is not None:
+        CONFIG['Requests']['Offline'] = offline
 
     _create_cache_folders(CONFIG)
 
@@ -88,8 +94,11 @@ def init(api_key: Optional[str] = None,
 def _load_default_config() -> dict:
     """Auxiliary function to load the default configuration."""
     config = {}
-    config['Directories'] = DEFAULT_PATHS
-    config['Requests'] = REQUESTS
+    config['Directories'] = deepcopy(DEFAULT_PATHS)
+    config['Requests'] = deepcopy(REQUESTS)
+    config['RateLimit'] = deepcopy(RATE_LIMIT)
+    config['CircuitBreaker'] = deepcopy(CIRCUIT_BREAKER)
+    config['Cache'] = deepcopy(CACHE)
     return config
 
 
@@ -0,0 +1,141 @@
+"""Transports used by the asynchronous clients to send requests."""
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import threading
+from typing import Optional
+
+from sprynger.utils.fetch import SESSION_POOL
+from sprynger.utils.parse import chained_get
+
+try:
+    import aiohttp
+except ModuleNotFoundError:
+    aiohttp = None
+
+
+class TransportResponse:
+    """Response returned by a transport. It mirrors the parts of
+    `requests.Response` used by sprynger."""
+    def __init__(self,
+                 status_code: int,
+                 content: bytes,
+                 headers: Optional[dict] = None) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self) -> dict:
+        """Decode the content as JSON."""
+        return json.loads(self.content)
+
+
+class AsyncTransport(ABC):
+    """Base class of the transports. Subclass it and implement `get` to send
+    the requests elsewhere, e.g. to a stub server in tests."""
+    @abstractmethod
+    async def get(self, url: str, params: dict, config: dict) -> TransportResponse:
+        """Send a GET request and return the response."""
+
+    async def close(self) -> None:
+        """Release the resources held by the transport."""
+
+
+class ThreadTransport(AsyncTransport):
+    """Transport that runs the pooled `requests` session in the default executor."""
+    async def get(self, url: str, params: dict, config: dict) -> TransportResponse:
+        max_retries = int(chained_get(config, ['Requests', 'Retries'], 5))
+        backoff_factor = float(chained_get(config, ['Requests', 'BackoffFactor'], 2.0))
+        timeout = int(chained_get(config, ['Requests', 'Timeout'], 20))
+        pool_connections = int(chained_get(config, ['Requests', 'PoolConnections'], 10))
+        pool_maxsize = int(chained_get(config, ['Requests', 'PoolMaxsize'], 10))
+        session = SESSION_POOL.get(max_retries, backoff_factor, pool_connections, pool_maxsize)
+        res = await asyncio.to_thread(session.get, url, params=params, timeout=timeout)
+        return TransportResponse(res.status_code, res.content, dict(res.headers))
+
+
+class AiohttpTransport(AsyncTransport):
+    """Native asyncio transport based on `aiohttp` (optional dependency).
+
+    One pooled `aiohttp.ClientSession` is kept per event loop and reused by all
+    queries running in that loop, until `close()` is awaited.
+    """
+    def __init__(self) -> None:
+        if aiohttp is None:
+            raise ModuleNotFoundError('AiohttpTransport requires aiohttp. '
+                                      'Install it with `pip install sprynger[async]`.')
+        self._sessions: dict[asyncio.AbstractEventLoop, 'aiohttp.ClientSession'] = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, pool_maxsize: int) -> 'aiohttp.ClientSession':
+        """Session of the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Sessions of closed loops can't be used (nor closed) anymore
+            for old_loop in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[old_loop]
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(limit=pool_maxsize)
+                session = aiohttp.ClientSession(connector=connector)
+                self._sessions[loop] = session
+            return session
+
+    async def get(self, url: str, params: dict, config: dict) -> TransportResponse:
+        timeout = int(chained_get(config, ['Requests', 'Timeout'], 20))
+        pool_maxsize = int(chained_get(config, ['Requests', 'PoolMaxsize'], 10))
+        session = self._get_session(pool_maxsize)
+
+        params = {k: str(v) for k, v in params.items()}
+        async with session.get(url, params=params,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+            content = await res.read()
+            return TransportResponse(res.status, content, dict(res.headers))
+
+    async def close(self) -> None:
+        """Close the session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    def close_nowait(self) -> None:
+        """Close the sessions of all event loops from synchronous code."""
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        for loop, session in sessions:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                loop.run_until_complete(session.close())
+
+
+_DEFAULT_TRANSPORT: Optional[AsyncTransport] = None
+_DEFAULT_TRANSPORT_LOCK = threading.Lock()
+
+
+def default_transport() -> AsyncTransport:
+    """Shared transport of the async clients: aiohttp if it is installed, otherwise
+    the thread transport (which reuses the pooled `requests` sessions)."""
+    global _DEFAULT_TRANSPORT
+    with _DEFAULT_TRANSPORT_LOCK:
+        if _DEFAULT_TRANSPORT is None:
+            _DEFAULT_TRANSPORT = AiohttpTransport() if aiohttp is not None else ThreadTransport()
+        return _DEFAULT_TRANSPORT
+
+
+async def aclose_sessions() -> None:
+    """Close the pooled sessions of the async clients in the running event loop.
+    Await it before the loop ends, e.g. at the end of the coroutine passed to `asyncio.run`."""
+    if _DEFAULT_TRANSPORT is not None:
+        await _DEFAULT_TRANSPORT.close()
+
+
+def close_transport_sessions() -> None:
+    """Close the pooled sessions of the async clients from synchronous code."""
+    if isinstance(_DEFAULT_TRANSPORT, AiohttpTransport):
+        _DEFAULT_TRANSPORT.close_nowait()